@@ -0,0 +1,163 @@
+"""
+Per-month calendar cache, persisted in SQLite and keyed by
+(broker, account, year, month).
+
+Closed months never change, so a computed {"days", "weeks"} result is reused
+until the deals underneath it change. Each entry stores the fingerprint of
+the month in the daily rollup it was built from (DailyRollup.month_fingerprints);
+a month is only recomputed when the rollup folds a new deal into it — in
+practice the current month.
+
+The database lives in the project root (one level above mt5_server/) so it
+persists across updates that only replace mt5_server/ contents.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from calendar import timegm
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Project root — survives updates
+_DB_FILE = Path(__file__).resolve().parent.parent / "calendar_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calendar_months (
+    broker      TEXT    NOT NULL,
+    account     INTEGER NOT NULL,
+    year        INTEGER NOT NULL,
+    month       INTEGER NOT NULL,
+    fingerprint TEXT    NOT NULL,
+    payload     TEXT    NOT NULL,
+    PRIMARY KEY (broker, account, year, month)
+);
+"""
+
+
+_EMPTY_MONTH = {"days": {}, "weeks": {}}
+
+
+def month_bounds(year: int, month: int) -> tuple[int, int]:
+    """UTC epoch seconds [start, end) of a calendar month."""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return (
+        timegm((year, month, 1, 0, 0, 0)),
+        timegm((next_year, next_month, 1, 0, 0, 0)),
+    )
+
+
+def month_totals(days: dict) -> dict:
+    """Sum of a month's (or year's) day entries."""
+    totals = {"pnl": 0.0, "trades": 0, "wins": 0, "losses": 0, "trading_days": len(days)}
+    for entry in days.values():
+        totals["pnl"] += entry["pnl"]
+        totals["trades"] += entry["trades"]
+        totals["wins"] += entry["wins"]
+        totals["losses"] += entry["losses"]
+    totals["pnl"] = round(totals["pnl"], 2)
+    return totals
+
+
+def year_payload(year: int, months: dict) -> dict:
+    """
+    /calendar/year response: every month's {"days", "weeks", "totals"} plus
+    the whole year's totals. Month keys are strings, as in JSON.
+    """
+    out = {}
+    all_days: dict = {}
+    for month in range(1, 13):
+        result = months.get(month, _EMPTY_MONTH)
+        out[str(month)] = {**result, "totals": month_totals(result["days"])}
+        all_days.update(result["days"])
+    return {"year": year, "months": out, "totals": month_totals(all_days)}
+
+
+class CalendarCache:
+    def __init__(self, db_path: Path = _DB_FILE):
+        self._db_path = Path(db_path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._mem: dict = {}     # (broker, account, year, month) → (fingerprint, result)
+
+    def _conn(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._db is None:
+            self._db = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def _load(self, key: tuple) -> Optional[tuple]:
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                return hit
+            row = self._conn().execute(
+                "SELECT fingerprint, payload FROM calendar_months "
+                "WHERE broker = ? AND account = ? AND year = ? AND month = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            hit = (row[0], json.loads(row[1]))
+            self._mem[key] = hit
+            return hit
+
+    def _store(self, key: tuple, fingerprint: str, result: dict) -> None:
+        # JSON round trip so cached and fresh results look identical
+        # (week numbers become string keys, exactly as in the HTTP response)
+        payload = json.dumps(result)
+        with self._lock:
+            self._mem[key] = (fingerprint, json.loads(payload))
+            with self._conn() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO calendar_months VALUES (?,?,?,?,?,?)",
+                    (*key, fingerprint, payload),
+                )
+
+    def get_or_compute(self, broker: str, account: int, year: int, month: int,
+                       fingerprint: str, compute: Callable[[], dict]) -> dict:
+        """Cached month result while `fingerprint` is unchanged, else `compute()`."""
+        key = (broker, int(account), int(year), int(month))
+        hit = self._load(key)
+        if hit is not None and hit[0] == fingerprint:
+            return hit[1]
+        self._store(key, fingerprint, compute())
+        return self._mem[key][1]
+
+    def get_or_compute_year(self, broker: str, account: int, year: int,
+                            fingerprints: dict, compute: Callable[[list], dict]) -> dict:
+        """
+        Month results for several months of one year ({month: fingerprint}).
+        Months whose fingerprint changed are rebuilt by a single
+        `compute(stale_months)` call returning {month: result}, so a cold
+        year costs one history read and one bucketing pass.
+        """
+        results: dict = {}
+        stale: list = []
+        for month, fingerprint in fingerprints.items():
+            hit = self._load((broker, int(account), int(year), int(month)))
+            if hit is not None and hit[0] == fingerprint:
+                results[month] = hit[1]
+            else:
+                stale.append(month)
+
+        if stale:
+            fresh = compute(stale)
+            for month in stale:
+                key = (broker, int(account), int(year), int(month))
+                self._store(key, fingerprints[month], fresh.get(month, _EMPTY_MONTH))
+                results[month] = self._mem[key][1]
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+calendar_cache = CalendarCache()
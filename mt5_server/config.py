@@ -9,7 +9,17 @@ class Settings(BaseSettings):
     MT5_PASSWORD: Optional[str] = None
     MT5_SERVER: Optional[str] = None
     API_KEY: str = ""          # legacy, no longer used
-    POLL_INTERVAL: float = 1.0
+    POLL_INTERVAL: float = 1.0         # starting MT5 cadence; adapts between the bounds below
+    POLL_INTERVAL_MIN: float = 0.5     # open positions + watching dashboard + market open
+    POLL_INTERVAL_MAX: float = 10.0    # heartbeat: flat account, weekend or nobody watching
+    CT_POLL_INTERVAL_MIN: float = 2.0  # cTrader trader/reconcile requests count against rate limits
+    CT_POLL_INTERVAL_MAX: float = 30.0
+    CT_PUSH_INTERVAL: float = 0.5      # min seconds between cTrader /ws/live pushes
+    CT_SPOT_EMIT_RATE: float = 4.0     # max spot-driven cTrader snapshot updates per second
+    CT_HISTORY_RATE: float = 5.0       # Open API limit for historical requests per second
+    CT_BACKFILL_WINDOW_DAYS: float = 7.0   # max span of one ProtoOADealListReq
+    CT_BACKFILL_CONCURRENCY: int = 4   # deal windows requested at once
+    WS_SEND_TIMEOUT: float = 2.0   # seconds; a client slower than this is disconnected
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:8000"]
 
     class Config:
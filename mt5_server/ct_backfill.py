@@ -0,0 +1,197 @@
+"""
+Windowed, paginated cTrader deal backfill.
+
+ProtoOADealListReq covers at most CT_BACKFILL_WINDOW_DAYS per request and
+returns at most maxRows deals, flagging the rest with hasMore. A sync range
+is therefore cut into fixed time windows, and a page that comes back with
+hasMore is followed by requests for the part of its window the page did not
+reach. Up to CT_BACKFILL_CONCURRENCY windows are in flight at once; every
+request first takes a token from `history_bucket`, which holds the whole
+process to the Open API limit for historical requests (CT_HISTORY_RATE per
+second).
+
+Each page is written to the deal store as it arrives. The run reports how
+far the store is complete without gaps (`synced_to` — the end of the last
+window before the first one that failed), so the next sync resumes there
+rather than at the newest stored deal. The latest run per account is kept
+for /monitor.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from config import settings
+from ct_deal_store import _deal_ts
+
+logger = logging.getLogger(__name__)
+
+# Failed requests (error response, timeout) are retried this often, backing off
+RETRIES = 3
+RETRY_DELAY = 1.0
+
+
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `burst`; use from one event loop."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+history_bucket = TokenBucket(settings.CT_HISTORY_RATE)
+
+
+def split_windows(from_ms: int, to_ms: int, window_ms: int) -> list:
+    """[(lo, hi), …] covering [from_ms, to_ms], oldest first; edges are shared."""
+    windows = []
+    lo = from_ms
+    while lo < to_ms:
+        hi = min(lo + window_ms, to_ms)
+        windows.append((lo, hi))
+        lo = hi
+    return windows
+
+
+class BackfillProgress:
+    def __init__(self, account_id: int, windows: int):
+        self.account_id   = account_id
+        self.windows      = windows
+        self.windows_done = 0
+        self.failed       = 0
+        self.pages        = 0
+        self.deals        = 0       # received, overlap included
+        self.added        = 0       # new in the store
+        self.synced_to: Optional[int] = None
+        self.started      = time.time()
+        self.finished: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "account_id":   self.account_id,
+            "windows":      self.windows,
+            "windows_done": self.windows_done,
+            "failed":       self.failed,
+            "pages":        self.pages,
+            "deals":        self.deals,
+            "added":        self.added,
+            "synced_to":    self.synced_to,
+            "running":      self.finished is None,
+            "seconds":      round((self.finished or time.time()) - self.started, 1),
+        }
+
+
+_runs: Dict[int, BackfillProgress] = {}     # account_id → latest run
+
+
+def progress() -> list:
+    return [run.as_dict() for run in _runs.values()]
+
+
+async def backfill(
+    account_id: int,
+    from_ms: int,
+    to_ms: int,
+    fetch_page: Callable[[int, int], Awaitable[tuple]],
+    store,
+    bucket: Optional[TokenBucket] = None,
+    concurrency: Optional[int] = None,
+    window_ms: Optional[int] = None,
+) -> BackfillProgress:
+    """
+    Pull every deal in [from_ms, to_ms] into `store` (CtDealStore.add).
+    `fetch_page(lo, hi)` is one request: (deals, has_more); it raises on
+    failure. Returns the run's progress, with `synced_to` set once at least
+    the first window is complete.
+    """
+    bucket = bucket or history_bucket
+    concurrency = concurrency or settings.CT_BACKFILL_CONCURRENCY
+    window_ms = window_ms or int(settings.CT_BACKFILL_WINDOW_DAYS * 86_400_000)
+
+    windows = split_windows(from_ms, to_ms, window_ms)
+    run = _runs[account_id] = BackfillProgress(account_id, len(windows))
+    queue = deque(enumerate(windows))
+    done = [False] * len(windows)
+    loop = asyncio.get_running_loop()
+
+    async def _page(lo: int, hi: int) -> tuple:
+        for attempt in range(RETRIES + 1):
+            await bucket.acquire()
+            try:
+                return await fetch_page(lo, hi)
+            except Exception as exc:
+                if attempt == RETRIES:
+                    raise
+                logger.info(f"cTrader deal page {lo}–{hi} failed ({exc!r}), retrying")
+                await asyncio.sleep(RETRY_DELAY * 2 ** attempt)
+
+    async def _window(lo: int, hi: int) -> None:
+        todo = [(lo, hi)]
+        while todo:
+            lo, hi = todo.pop()
+            deals, has_more = await _page(lo, hi)
+            run.pages += 1
+            run.deals += len(deals)
+            if deals:
+                added = await loop.run_in_executor(None, store.add, account_id, deals)
+                run.added += added
+            if not has_more:
+                continue
+            # The page covers [first, last] of its window — ask for what lies
+            # on either side of it (the edge millisecond again; dealId de-duplicates)
+            stamps = [_deal_ts(d) for d in deals]
+            first, last = (min(stamps), max(stamps)) if stamps else (lo, hi)
+            if first <= lo and last >= hi:
+                raise RuntimeError(f"more than one page of deals at {lo}–{hi} cannot be narrowed")
+            if last < hi:
+                todo.append((last, hi))
+            if first > lo:
+                todo.append((lo, first))
+
+    async def _worker() -> None:
+        while queue and not run.failed:
+            index, (lo, hi) = queue.popleft()
+            try:
+                await _window(lo, hi)
+            except Exception as exc:
+                run.failed += 1
+                logger.warning(f"cTrader deal backfill for {account_id} stopped at {lo}–{hi}: {exc!r}")
+                return
+            done[index] = True
+            run.windows_done += 1
+
+    if len(windows) > 1:
+        logger.info(f"cTrader deal backfill for {account_id}: {len(windows)} windows")
+    try:
+        await asyncio.gather(*(_worker() for _ in range(min(concurrency, len(windows)))))
+    finally:
+        run.finished = time.time()
+
+    complete = 0
+    while complete < len(windows) and done[complete]:
+        complete += 1
+    if complete:
+        run.synced_to = windows[complete - 1][1]
+    if len(windows) > 1 or run.failed:
+        logger.info(
+            f"cTrader deal backfill for {account_id}: {run.added} new deals, "
+            f"{run.pages} pages, {run.windows_done}/{run.windows} windows"
+        )
+    return run
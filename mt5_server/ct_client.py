@@ -4,43 +4,66 @@ cTrader Open API client.
 Runs a persistent Twisted reactor in a daemon background thread.
 All cTrader requests are dispatched via reactor.callFromThread().
 Thread-safe results are readable via get_snapshot() / get_equity_history().
+History requests (fetch_deal_page, fetch_cash_flows) are coroutines: the reactor
+thread resolves their asyncio futures, so no thread waits on the server.
 
 Connection lifecycle
 ────────────────────
 connect(…)   → starts reactor if needed → authenticates → starts polling
 disconnect() → unsubscribes spots, sends ProtoOAAccountLogoutReq, stops poll
+
+Open positions live in an in-memory table updated by ProtoOAExecutionEvent
+(fills, closes, amendments); ProtoOAReconcileReq runs every RECONCILE_EVERY
+seconds only to correct anything a missed event left behind.
 """
 
 import logging
 import time
 import threading
-from collections import deque
 from datetime import datetime
 from threading import Lock, Event
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 # ── Shared state (protected by _lock) ────────────────────────────────────────
 _lock = Lock()
 _snapshot: Dict[str, Any] = {}
-_equity_history: deque = deque(maxlen=500)
 _symbol_map: Dict[int, str] = {}         # symbolId → name
 _spot_prices: Dict[int, Dict] = {}       # symbolId → {bid, ask}
-_positions_raw: list = []                # list of ProtoOAPosition objects
+_positions: Dict[int, Any] = {}          # positionId → ProtoOAPosition (open only)
+_positions_parsed: Dict[int, dict] = {}  # positionId → parse_ct_positions() dict
+_positions_by_symbol: Dict[int, set] = {}  # symbolId → positionIds (spot ticks touch only these)
+_spot_subscribed: set = set()            # symbolIds with a live spot subscription
+_floating = 0.0                          # Σ profit_raw of open positions, moved per spot tick
+_emit_pending = False                    # a throttled _emit_prices() is scheduled
+_last_emit = 0.0                         # time.monotonic() of the last spot-driven publication
+_change_listener: Optional[Callable[[], None]] = None   # ct_live bridge, called on the reactor thread
+_loop = None                             # asyncio loop of the app, set by ct_live
 
 # Connection state
 _connected   = False
 _error: Optional[str] = None
 _client      = None
 _account_id: Optional[int] = None
+_registered_ms: Optional[int] = None     # ProtoOATrader.registrationTimestamp — where deal history starts
 _poll_handle = None                      # Twisted IDelayedCall
 
 # Reactor thread (singleton — reactor can only run once per process)
 _reactor_started = False
 _reactor_lock    = threading.Lock()
 
-POLL_INTERVAL = 5  # seconds between data refreshes
+POLL_INTERVAL = 5  # starting seconds between data refreshes; adapts within CT_POLL_INTERVAL_MIN/MAX
+
+# Positions are kept current by ProtoOAExecutionEvent; the full reconcile is
+# only a consistency check against missed events
+RECONCILE_EVERY = 60.0
+_last_reconcile = 0.0                    # time.monotonic() of the last ProtoOAReconcileReq
+
+_POSITION_STATUS_OPEN = 1                # ProtoOAPositionStatus.POSITION_STATUS_OPEN
+_BALANCE_EXECUTIONS   = {9, 10, 12}      # SWAP, DEPOSIT_WITHDRAW, BONUS_DEPOSIT_WITHDRAW
+
+_cadence = None                          # poll_cadence.AdaptiveInterval, created on first poll
 
 
 def _resolve_protobuf_endpoint(endpoints_cls, is_live: Optional[bool] = None):
@@ -120,11 +143,12 @@ def connect(client_id: str, client_secret: str,
     Authenticate with cTrader.
     Returns (True, None) on success, (False, error_message) on failure.
     """
-    global _account_id, _client, _connected, _error
+    global _account_id, _client, _connected, _error, _registered_ms
 
     _ensure_reactor()
 
     _account_id = account_id
+    _registered_ms = None
 
     auth_event  = Event()
     auth_result = {"ok": False, "error": None}
@@ -143,13 +167,15 @@ def connect(client_id: str, client_secret: str,
                 ProtoOAReconcileReq,       ProtoOAReconcileRes,
                 ProtoOATraderReq,          ProtoOATraderRes,
                 ProtoOACashFlowHistoryListRes,
-                ProtoOASubscribeSpotsReq,
                 ProtoOASpotEvent,
                 ProtoOADealListRes,
+                ProtoOAExecutionEvent,
                 ProtoOAErrorRes,
             )
             from ctrader_open_api import Protobuf
 
+            _reset_positions()
+
             # Stop previous client if any
             if _client is not None:
                 try:
@@ -173,6 +199,7 @@ def connect(client_id: str, client_secret: str,
                 logger.warning(f"cTrader disconnected: {reason}")
                 with _lock:
                     _connected = False
+                _reject_all(f"cTrader disconnected: {reason}")
 
             # ── Step 2: Account auth ────────────────────────────────────────
             def on_app_auth_res(client, message):
@@ -204,6 +231,8 @@ def connect(client_id: str, client_secret: str,
             def on_error(client, message):
                 msg = Protobuf.extract(message)
                 err = getattr(msg, "description", "Unknown cTrader error")
+                if _reject(getattr(message, "clientMsgId", None), CtRequestError(err)):
+                    return
                 logger.error(f"cTrader error: {err}")
                 auth_result["error"] = err
                 auth_event.set()
@@ -218,61 +247,69 @@ def connect(client_id: str, client_secret: str,
                     if msg.HasField("ask"):
                         entry["ask"] = msg.ask / 100000
                     _spot_prices[msg.symbolId] = entry
+                if _reprice_symbol(msg.symbolId):
+                    _schedule_emit()
 
             # ── Account info response ────────────────────────────────────────
             def on_trader_res(client, message):
+                global _floating, _registered_ms
                 from ct_data_parser import parse_ct_account
+                from equity_history import equity_store
                 msg     = Protobuf.extract(message)
                 trader  = msg.trader
                 with _lock:
-                    positions = list(_positions_raw)
+                    positions = list(_positions.values())
                 acct = parse_ct_account(trader, positions, _spot_prices)
                 with _lock:
+                    prev_balance = (_snapshot.get("account") or {}).get("balance")
+                    # Full recomputation — also clears any rounding drift of the running sum
+                    _floating = acct["floating_pnl"]
+                    _registered_ms = int(getattr(trader, "registrationTimestamp", 0) or 0) or None
                     _snapshot["account"]   = acct
                     _snapshot["timestamp"] = datetime.utcnow().isoformat()
-                    _equity_history.append({
-                        "ts":      datetime.utcnow().isoformat(),
-                        "equity":  acct.get("equity", acct.get("balance", 0)),
-                        "balance": acct.get("balance", 0),
-                        "pnl":     acct.get("floating_pnl", 0),
-                    })
+                equity_store.record(
+                    "ctrader", account_id,
+                    acct.get("equity", acct.get("balance", 0)),
+                    acct.get("balance", 0),
+                    acct.get("floating_pnl", 0),
+                )
+                # Answer to fetch_registration_ms(), if it asked
+                _resolve(getattr(message, "clientMsgId", None), msg)
+                # A closed position (new exit deal) moves the balance — only then
+                # pull the new deals into the store and the daily rollup
+                if acct.get("balance") != prev_balance:
+                    _refresh_deal_history(account_id)
+                _notify_change()
 
             # ── Reconcile (open positions) response ──────────────────────────
             def on_reconcile_res(client, message):
-                from ct_data_parser import parse_ct_positions
+                msg   = Protobuf.extract(message)
+                raw   = list(msg.position)
+                drift = _replace_positions(raw)
+                if drift:
+                    logger.info(f"cTrader reconcile corrected {drift} position(s) missed by execution events")
+                _notify_change()
+                _subscribe_spots(client, account_id, {p.tradeData.symbolId for p in raw})
+
+            # ── Execution events (fills, closes, amendments) ────────────────
+            def on_execution_event(client, message):
                 msg = Protobuf.extract(message)
-                raw = list(msg.position)
-
-                # Subscribe to spots for all open symbols
-                sym_ids = list({p.tradeData.symbolId for p in raw})
-                if sym_ids:
-                    req = ProtoOASubscribeSpotsReq()
+                if msg.HasField("position") and _apply_position(msg.position):
+                    _subscribe_spots(client, account_id, {msg.position.tradeData.symbolId})
+                    _notify_change()
+                # A fill or a cash movement changes the balance — refresh it now
+                # instead of waiting for the next trader poll
+                if msg.HasField("deal") or msg.executionType in _BALANCE_EXECUTIONS:
+                    req = ProtoOATraderReq()
                     req.ctidTraderAccountId = account_id
-                    for sid in sym_ids:
-                        req.symbolId.append(sid)
                     client.send(req)
 
-                parsed = parse_ct_positions(raw, _symbol_map, _spot_prices)
-                with _lock:
-                    _positions_raw[:] = raw
-                    _snapshot["positions"] = parsed
-
-            # ── Deal list response (correlated by clientMsgId) ───────────────
+            # ── Deal list / cashflow responses (correlated by clientMsgId) ──
             def on_deal_list_res(client, message):
-                msg     = Protobuf.extract(message)
-                corr_id = message.clientMsgId
-                if corr_id in _deal_pending:
-                    _deal_pending[corr_id]["deals"].extend(list(msg.deal))
-                    if not msg.hasMore:
-                        _deal_pending[corr_id]["event"].set()
+                _resolve(message.clientMsgId, Protobuf.extract(message))
 
-            # ── Cashflow list response (correlated by clientMsgId) ─────────
             def on_cashflow_list_res(client, message):
-                msg = Protobuf.extract(message)
-                corr_id = message.clientMsgId
-                if corr_id in _cashflow_pending:
-                    _cashflow_pending[corr_id]["items"].extend(list(msg.depositWithdraw))
-                    _cashflow_pending[corr_id]["event"].set()
+                _resolve(message.clientMsgId, Protobuf.extract(message))
 
             # ── Register all callbacks ────────────────────────────────────────
             callbacks = {
@@ -282,6 +319,7 @@ def connect(client_id: str, client_secret: str,
                 ProtoOATraderRes().payloadType:          on_trader_res,
                 ProtoOAReconcileRes().payloadType:       on_reconcile_res,
                 ProtoOASpotEvent().payloadType:          on_spot_event,
+                ProtoOAExecutionEvent().payloadType:     on_execution_event,
                 ProtoOADealListRes().payloadType:        on_deal_list_res,
                 ProtoOACashFlowHistoryListRes().payloadType: on_cashflow_list_res,
                 ProtoOAErrorRes().payloadType:           on_error,
@@ -333,6 +371,7 @@ def disconnect():
         except Exception:
             pass
         _client = None
+    _reject_all("cTrader disconnected")
 
 
 def is_connected() -> bool:
@@ -340,20 +379,88 @@ def is_connected() -> bool:
         return _connected
 
 
+def get_account_id() -> Optional[int]:
+    return _account_id
+
+
+def set_change_listener(listener: Optional[Callable[[], None]]) -> None:
+    """Register a callable run (on the reactor thread) whenever the snapshot changes."""
+    global _change_listener
+    _change_listener = listener
+
+
+def set_event_loop(loop) -> None:
+    """The asyncio loop that reactor-side work (deal refreshes) is handed to."""
+    global _loop
+    _loop = loop
+
+
+def _notify_change() -> None:
+    listener = _change_listener
+    if listener is not None:
+        try:
+            listener()
+        except Exception:
+            logger.exception("cTrader change listener failed")
+
+
 def get_snapshot() -> Dict[str, Any]:
     with _lock:
         return dict(_snapshot)
 
 
-def get_equity_history() -> list:
-    with _lock:
-        return list(_equity_history)
+def get_equity_history(range_: str = "1h", resolution: Optional[str] = None):
+    """equity_history.Series (NumPy columns) of the connected account."""
+    from equity_history import EMPTY, equity_store
+    if _account_id is None:
+        return EMPTY
+    return equity_store.series("ctrader", _account_id, range_, resolution)
+
+
+# ── Async requests ────────────────────────────────────────────────────────────
+
+class CtRequestError(RuntimeError):
+    """The server answered a request with ProtoOAErrorRes (or it could not be sent)."""
+
 
+_pending: Dict[str, tuple] = {}   # clientMsgId → (asyncio loop, future) of an awaiting request()
 
-# ── Deal list fetcher ─────────────────────────────────────────────────────────
 
-_deal_pending: Dict[str, Any] = {}   # corr_id → {"event": Event, "deals": list}
-_cashflow_pending: Dict[str, Any] = {}  # corr_id → {"event": Event, "items": list}
+def _settle(future, result=None, error: Optional[BaseException] = None) -> None:
+    # Runs on the future's loop; a request that already timed out is left alone
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _hand_over(corr_id: str, result=None, error: Optional[BaseException] = None) -> bool:
+    """Reactor thread → the awaiting loop. False if nobody waits for `corr_id`."""
+    entry = _pending.pop(corr_id, None) if corr_id else None
+    if entry is None:
+        return False
+    loop, future = entry
+    try:
+        loop.call_soon_threadsafe(_settle, future, result, error)
+    except RuntimeError:            # loop already closed (shutdown)
+        pass
+    return True
+
+
+def _resolve(corr_id: str, msg) -> bool:
+    return _hand_over(corr_id, result=msg)
+
+
+def _reject(corr_id: str, error: BaseException) -> bool:
+    return _hand_over(corr_id, error=error)
+
+
+def _reject_all(reason: str) -> None:
+    for corr_id in list(_pending):
+        _reject(corr_id, CtRequestError(reason))
+
 
 
 def get_accounts_by_token(
@@ -451,73 +558,252 @@ def get_accounts_by_token(
     return result["accounts"], None
 
 
-def fetch_deals(from_ts_ms: int, to_ts_ms: int, max_rows: int = 10000) -> list:
+async def request(req, timeout: float) -> Any:
     """
-    Blocking call — fetches closed deals from cTrader for the given time range.
-    Returns list of ProtoOADeal objects. Must NOT be called from the Twisted thread.
+    Send `req` on the live connection and await its (extracted) response.
+
+    Callable only from an asyncio loop. The request is sent with a fresh
+    clientMsgId; the reactor thread hands the correlated response (or a
+    ProtoOAErrorRes, as CtRequestError) back through call_soon_threadsafe,
+    so nothing but the future waits for the server.
     """
+    import asyncio
     import uuid
     if not _connected or _client is None:
-        return []
+        raise CtRequestError("cTrader not connected")
 
+    loop    = asyncio.get_running_loop()
+    future  = loop.create_future()
     corr_id = uuid.uuid4().hex
-    ev      = Event()
-    _deal_pending[corr_id] = {"event": ev, "deals": []}
+    _pending[corr_id] = (loop, future)
 
     def _send():
         try:
-            from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOADealListReq
-            req = ProtoOADealListReq()
-            req.ctidTraderAccountId = _account_id
-            req.fromTimestamp       = from_ts_ms
-            req.toTimestamp         = to_ts_ms
-            req.maxRows             = max_rows
             _client.send(req, clientMsgId=corr_id)
         except Exception as exc:
-            logger.error(f"CT fetch_deals send error: {exc}")
-            _deal_pending.pop(corr_id, None)
-            ev.set()
+            _reject(corr_id, CtRequestError(f"send failed: {exc}"))
 
     from twisted.internet import reactor
     reactor.callFromThread(_send)
-    ev.wait(timeout=30.0)
-    return _deal_pending.pop(corr_id, {}).get("deals", [])
+    try:
+        return await asyncio.wait_for(future, timeout)
+    finally:
+        _pending.pop(corr_id, None)
 
 
-def fetch_cash_flows(from_ts_ms: int, to_ts_ms: int) -> list:
+async def fetch_deal_page(from_ts_ms: int, to_ts_ms: int, max_rows: int = 10000) -> tuple[list, bool]:
     """
-    Blocking call — fetches account cashflow history (deposits/withdrawals).
-    Returns list of ProtoOADepositWithdraw objects.
+    One ProtoOADealListReq: (deals, hasMore). The range may span at most a
+    week; ct_backfill splits longer ones and follows hasMore. Raises
+    CtRequestError / asyncio.TimeoutError.
     """
-    import uuid
-    if not _connected or _client is None:
+    from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOADealListReq
+    req = ProtoOADealListReq()
+    req.ctidTraderAccountId = _account_id
+    req.fromTimestamp       = from_ts_ms
+    req.toTimestamp         = to_ts_ms
+    req.maxRows             = max_rows
+    msg = await request(req, timeout=30.0)
+    return list(msg.deal), bool(msg.hasMore)
+
+
+async def fetch_registration_ms() -> int:
+    """
+    ProtoOATrader.registrationTimestamp — where the account's deal history
+    starts. Known once the first trader response has arrived; before that
+    (right after connect) it is asked for. Raises CtRequestError when the
+    server does not report it.
+    """
+    if _registered_ms is not None:
+        return _registered_ms
+    from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOATraderReq
+    req = ProtoOATraderReq()
+    req.ctidTraderAccountId = _account_id
+    msg = await request(req, timeout=10.0)
+    registered = int(getattr(msg.trader, "registrationTimestamp", 0) or 0)
+    if not registered:
+        raise CtRequestError("no registration timestamp for the account")
+    return registered
+
+
+async def fetch_cash_flows(from_ts_ms: int, to_ts_ms: int) -> list:
+    """Deposits/withdrawals (ProtoOADepositWithdraw) in the time range; [] if the request fails."""
+    from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOACashFlowHistoryListReq
+    req = ProtoOACashFlowHistoryListReq()
+    req.ctidTraderAccountId = _account_id
+    req.fromTimestamp       = from_ts_ms
+    req.toTimestamp         = to_ts_ms
+    try:
+        msg = await request(req, timeout=8.0)
+    except Exception as exc:
+        logger.error(f"CT fetch_cash_flows failed: {exc!r}")
         return []
+    return list(msg.depositWithdraw)
 
-    corr_id = uuid.uuid4().hex
-    ev = Event()
-    _cashflow_pending[corr_id] = {"event": ev, "items": []}
 
-    def _send():
-        try:
-            from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOACashFlowHistoryListReq
-            req = ProtoOACashFlowHistoryListReq()
-            req.ctidTraderAccountId = _account_id
-            req.fromTimestamp = from_ts_ms
-            req.toTimestamp = to_ts_ms
-            _client.send(req, clientMsgId=corr_id)
-        except Exception as exc:
-            logger.error(f"CT fetch_cash_flows send error: {exc}")
-            _cashflow_pending.pop(corr_id, None)
-            ev.set()
+# ── Position table ────────────────────────────────────────────────────────────
 
+def _reset_positions():
+    """Forget positions and subscriptions of the previous session."""
+    global _last_reconcile, _floating
+    with _lock:
+        _positions.clear()
+        _positions_parsed.clear()
+        _positions_by_symbol.clear()
+        _spot_subscribed.clear()
+        _snapshot.pop("positions", None)
+        _floating = 0.0
+    _last_reconcile = 0.0
+
+
+def _index_add(position) -> None:
+    _positions_by_symbol.setdefault(position.tradeData.symbolId, set()).add(position.positionId)
+
+
+def _index_remove(position) -> None:
+    ids = _positions_by_symbol.get(position.tradeData.symbolId)
+    if ids is not None:
+        ids.discard(position.positionId)
+        if not ids:
+            del _positions_by_symbol[position.tradeData.symbolId]
+
+
+def _apply_position(position) -> bool:
+    """Upsert an open position or drop a closed one; True if the table changed."""
+    global _floating
+    from ct_data_parser import parse_ct_positions
+    pid = position.positionId
+    if position.positionStatus == _POSITION_STATUS_OPEN and position.tradeData.volume > 0:
+        parsed = parse_ct_positions([position], _symbol_map, _spot_prices)[0]
+        with _lock:
+            old = _positions.get(pid)
+            if old is not None:
+                _index_remove(old)
+                _floating -= _positions_parsed[pid]["profit_raw"]
+            _positions[pid] = position
+            _positions_parsed[pid] = parsed
+            _index_add(position)
+            _floating += parsed["profit_raw"]
+            _snapshot["positions"] = list(_positions_parsed.values())
+        return True
+    with _lock:
+        old = _positions.pop(pid, None)
+        if old is None:
+            return False
+        _index_remove(old)
+        _floating -= _positions_parsed.pop(pid)["profit_raw"]
+        _snapshot["positions"] = list(_positions_parsed.values())
+    return True
+
+
+def _replace_positions(positions: list) -> int:
+    """Full reconcile result replaces the table; returns how many positions had drifted."""
+    global _floating
+    from ct_data_parser import parse_ct_positions
+    fresh  = {p.positionId: p for p in positions}
+    parsed = parse_ct_positions(positions, _symbol_map, _spot_prices)
+    with _lock:
+        drift = len(_positions.keys() ^ fresh.keys()) + sum(
+            1 for pid, p in fresh.items()
+            if pid in _positions and _positions[pid].tradeData.volume != p.tradeData.volume
+        )
+        _positions.clear()
+        _positions.update(fresh)
+        _positions_parsed.clear()
+        _positions_parsed.update(zip(fresh, parsed))
+        _positions_by_symbol.clear()
+        for position in positions:
+            _index_add(position)
+        _floating = sum(row["profit_raw"] for row in parsed)
+        _snapshot["positions"] = parsed
+    return drift
+
+
+def _reprice_symbol(symbol_id: int) -> bool:
+    """
+    Spot tick: re-price only the open positions on `symbol_id` and move the
+    running floating P&L by their change. Nothing is published here — see
+    _schedule_emit().
+    """
+    global _floating
+    from ct_data_parser import parse_ct_positions
+    with _lock:
+        hit = [_positions[pid] for pid in _positions_by_symbol.get(symbol_id, ())]
+    if not hit:
+        return False
+    parsed = parse_ct_positions(hit, _symbol_map, _spot_prices)
+    with _lock:
+        for position, row in zip(hit, parsed):
+            old = _positions_parsed.get(position.positionId)
+            if old is None:          # closed while we were parsing
+                continue
+            _floating += row["profit_raw"] - old["profit_raw"]
+            _positions_parsed[position.positionId] = row
+    return True
+
+
+def _emit_prices() -> None:
+    """Publish re-priced positions and the equity they imply (reactor thread)."""
+    global _emit_pending, _last_emit
+    from ct_data_parser import with_ct_floating
+    _emit_pending = False
+    _last_emit = time.monotonic()
+    with _lock:
+        _snapshot["positions"] = list(_positions_parsed.values())
+        account = _snapshot.get("account")
+        if account:
+            _snapshot["account"] = with_ct_floating(account, _floating)
+        _snapshot["timestamp"] = datetime.utcnow().isoformat()
+    _notify_change()
+
+
+def _schedule_emit() -> None:
+    """At most CT_SPOT_EMIT_RATE publications per second, the last tick always included."""
+    global _emit_pending
+    if _emit_pending:
+        return
+    from config import settings
     from twisted.internet import reactor
-    reactor.callFromThread(_send)
-    ev.wait(timeout=8.0)
-    return _cashflow_pending.pop(corr_id, {}).get("items", [])
+    _emit_pending = True
+    delay = _last_emit + 1.0 / settings.CT_SPOT_EMIT_RATE - time.monotonic()
+    reactor.callLater(max(0.0, delay), _emit_prices)
+
+
+def _subscribe_spots(client, account_id: int, symbol_ids) -> None:
+    """Subscribe to spot prices for symbols not subscribed yet (Twisted thread)."""
+    new = [sid for sid in symbol_ids if sid not in _spot_subscribed]
+    if not new:
+        return
+    from ctrader_open_api.messages.OpenApiMessages_pb2 import ProtoOASubscribeSpotsReq
+    req = ProtoOASubscribeSpotsReq()
+    req.ctidTraderAccountId = account_id
+    for sid in new:
+        req.symbolId.append(sid)
+    client.send(req)
+    _spot_subscribed.update(new)
 
 
 # ── Internal polling ──────────────────────────────────────────────────────────
 
+def _refresh_deal_history(account_id: int):
+    """Reactor thread — start the deal sync on the asyncio loop, without waiting for it."""
+    import asyncio
+    from ct_poller import sync_deal_history_async
+    loop = _loop
+    if loop is None:            # no loop bound yet — the next history request syncs
+        return
+    try:
+        job = asyncio.run_coroutine_threadsafe(sync_deal_history_async(account_id, max_age=0), loop)
+    except RuntimeError:        # loop already closed (shutdown)
+        return
+    job.add_done_callback(_log_refresh_error)
+
+
+def _log_refresh_error(job) -> None:
+    if not job.cancelled() and job.exception() is not None:
+        logger.error(f"CT deal history refresh error: {job.exception()}")
+
+
 def _schedule_poll(client, account_id: int):
     """Start or reschedule the periodic poll — must be called from Twisted thread."""
     from twisted.internet import reactor
@@ -525,8 +811,8 @@ def _schedule_poll(client, account_id: int):
 
 
 def _poll_once(client, account_id: int):
-    """Runs inside Twisted thread every POLL_INTERVAL seconds."""
-    global _poll_handle
+    """Runs inside Twisted thread; reschedules itself at the adaptive cadence."""
+    global _poll_handle, _last_reconcile
     if client is None or not _connected:
         return
 
@@ -538,12 +824,29 @@ def _poll_once(client, account_id: int):
         req1.ctidTraderAccountId = account_id
         client.send(req1)
 
-        req2 = ProtoOAReconcileReq()
-        req2.ctidTraderAccountId = account_id
-        client.send(req2)
+        # Positions come from execution events; reconcile only as a periodic check
+        now = time.monotonic()
+        if now - _last_reconcile >= RECONCILE_EVERY:
+            req2 = ProtoOAReconcileReq()
+            req2.ctidTraderAccountId = account_id
+            client.send(req2)
+            _last_reconcile = now
     except Exception as exc:
         logger.error(f"CT poll error: {exc}")
 
     # Schedule next poll
     from twisted.internet import reactor
-    _poll_handle = reactor.callLater(POLL_INTERVAL, _poll_once, client, account_id)
+    _poll_handle = reactor.callLater(_next_poll_interval(), _poll_once, client, account_id)
+
+
+def _next_poll_interval() -> float:
+    """Fast while positions are open and a dashboard is watching, slow heartbeat otherwise."""
+    global _cadence
+    from config import settings
+    from poll_cadence import AdaptiveInterval
+    from ws_manager import ws_manager
+    if _cadence is None:
+        _cadence = AdaptiveInterval(settings.CT_POLL_INTERVAL_MIN, settings.CT_POLL_INTERVAL_MAX, POLL_INTERVAL)
+    with _lock:
+        open_positions = len(_positions)
+    return _cadence.update(open_positions, ws_manager.client_count())
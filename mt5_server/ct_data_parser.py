@@ -13,6 +13,8 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from downsample import downsample
+
 logger = logging.getLogger(__name__)
 
 _CENTS = 100          # divide CTrader monetary ints by this
@@ -33,23 +35,39 @@ def parse_ct_account(trader, positions: list, spot_prices: dict) -> dict:
         _approx_position_pnl(p, spot_prices)
         for p in positions
     )
-    equity = round(balance + floating, 2)
 
     margin = getattr(trader, "marginUsed", 0) or 0
     margin /= _CENTS
 
-    return {
+    account = {
         "login":            trader.ctidTraderAccountId,
         "name":             f"Account {trader.ctidTraderAccountId}",
         "server":           getattr(trader, "brokerName", "cTrader"),
         "currency":         "",        # filled later via deposit asset lookup
         "balance":          round(balance, 2),
-        "equity":           equity,
+        "equity":           None,      # equity-derived fields: with_ct_floating()
         "margin":           round(margin, 2),
+        "free_margin":      None,
+        "margin_level_pct": None,
+        "floating_pnl":     None,
+        "leverage":         (getattr(trader, "leverageInCents", 0) or 0) // _CENTS or None,
+    }
+    return with_ct_floating(account, floating)
+
+
+def with_ct_floating(account: dict, floating: float) -> dict:
+    """
+    Copy of a parse_ct_account() dict with the equity-derived fields set for
+    a new floating P&L — lets spot ticks move equity without a ProtoOATraderRes.
+    """
+    equity = round(account["balance"] + floating, 2)
+    margin = account.get("margin") or 0
+    return {
+        **account,
+        "equity":           equity,
         "free_margin":      round(equity - margin, 2),
         "margin_level_pct": round(equity / margin * 100, 2) if margin > 0 else None,
         "floating_pnl":     round(floating, 2),
-        "leverage":         (getattr(trader, "leverageInCents", 0) or 0) // _CENTS or None,
     }
 
 
@@ -141,41 +159,7 @@ def _ct_deals_to_rows(deals) -> list:
     return rows
 
 
-# ── Statistics (mirrors MT5 parse_statistics + compute_full_stats) ────────────
-
-def parse_ct_statistics(deals, days: int = 30, symbol_map: dict = None) -> dict:
-    """Like MT5 parse_statistics() but from CT deals."""
-    symbol_map = symbol_map or {}
-    rows = _ct_deals_to_rows(deals)
-    if not rows:
-        return {"error": "no closed trades", "days": days}
-
-    trades = _aggregate_ct_rows(rows, symbol_map)
-    wins   = [t for t in trades if t["pnl_net"] > 0]
-    losses = [t for t in trades if t["pnl_net"] < 0]
-    total  = len(trades)
-
-    gp  = sum(t["pnl_net"] for t in wins)
-    gl  = abs(sum(t["pnl_net"] for t in losses))
-
-    return {
-        "period_days":      days,
-        "total_trades":     total,
-        "winning_trades":   len(wins),
-        "losing_trades":    len(losses),
-        "win_rate_pct":     round(len(wins) / total * 100, 2) if total else 0,
-        "net_profit":       round(sum(t["pnl_net"] for t in trades), 2),
-        "gross_profit":     round(gp, 2),
-        "gross_loss":       round(gl, 2),
-        "profit_factor":    round(gp / gl, 2) if gl > 0 else None,
-        "avg_win":          round(sum(t["pnl_net"] for t in wins)   / len(wins),   2) if wins   else 0,
-        "avg_loss":         round(sum(t["pnl_net"] for t in losses) / len(losses), 2) if losses else 0,
-        "best_trade":       round(max(t["pnl_net"] for t in trades), 2) if trades else 0,
-        "worst_trade":      round(min(t["pnl_net"] for t in trades), 2) if trades else 0,
-        "total_commission": round(sum(t["commission"] for t in trades), 2),
-        "total_swap":       round(sum(t["swap"]       for t in trades), 2),
-    }
-
+# ── Statistics (mirrors MT5 compute_full_stats) ──────────────────────────────
 
 def compute_ct_full_stats(deals, balance_start: float, balance_end: float,
                           currency: str, days: int, symbol_map: dict = None) -> dict:
@@ -387,8 +371,11 @@ def compute_ct_overview(
     }
 
 
-def compute_ct_equity_curve(deals_all) -> list:
-    """Reconstruct balance curve from CT deal history."""
+def compute_ct_equity_curve(deals_all, max_points: Optional[int] = None) -> list:
+    """
+    Reconstruct balance curve from CT deal history.
+    With `max_points`, thinned by min/max bucketing so peaks and troughs stay.
+    """
     rows = _ct_deals_to_rows(deals_all)
     rows_sorted = sorted(rows, key=lambda r: r["time"])
     balance = 0.0
@@ -399,38 +386,7 @@ def compute_ct_equity_curve(deals_all) -> list:
             "ts":      r["time"].isoformat(),
             "balance": round(balance, 2),
         })
-    return points
-
-
-def compute_ct_calendar(deals, year: int, month: int, symbol_map: dict = None) -> dict:
-    """Compute calendar P&L from CT deals. Same output format as data_calendar."""
-    from calendar import monthrange
-
-    symbol_map = symbol_map or {}
-    rows   = _ct_deals_to_rows(deals)
-    trades = _aggregate_ct_rows(rows, symbol_map)
-
-    day_data: dict = {}
-    for t in trades:
-        if not t["close_time"]:
-            continue
-        dt   = datetime.fromisoformat(t["close_time"])
-        date = str(dt.date())
-
-        entry = day_data.setdefault(date, {"pnl": 0.0, "trades": 0, "wins": 0, "losses": 0})
-        entry["pnl"]    = round(entry["pnl"] + t["pnl_net"], 2)
-        entry["trades"] += 1
-        if t["pnl_net"] > 0:
-            entry["wins"]   += 1
-        elif t["pnl_net"] < 0:
-            entry["losses"] += 1
-
-    for date, entry in day_data.items():
-        total = entry["trades"]
-        entry["win_rate"] = round(entry["wins"] / total * 100, 2) if total > 0 else 0.0
-
-    week_data = _calc_weeks(year, month, day_data)
-    return {"days": day_data, "weeks": week_data}
+    return downsample(points, max_points)
 
 
 # ── Private helpers ────────────────────────────────────────────────────────────
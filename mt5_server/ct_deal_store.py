@@ -0,0 +1,183 @@
+"""
+Persistent cTrader deal store (SQLite), keyed by ctidTraderAccountId.
+
+Deals are kept as serialized ProtoOADeal payloads, so everything read back is
+the same protobuf object ct_data_parser already understands. After the first
+backfill (ct_backfill) only the tail since `synced_to` — the point up to which
+the store is known to be complete — is requested from the server; a process
+restart reuses what is already on disk.
+
+`store` is the single process-wide instance. As with the MT5 ledger, each
+account has a version that changes only when a sync stores new deals, and
+derived results (decoded history, equity curve) are memoized per version.
+
+The database lives in the project root (one level above mt5_server/) so it
+persists across updates that only replace mt5_server/ contents.
+"""
+
+import logging
+import sqlite3
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from deal_ledger import VersionedMemo
+
+logger = logging.getLogger(__name__)
+
+# Project root — survives updates
+_DB_FILE = Path(__file__).resolve().parent.parent / "ct_deals.sqlite3"
+
+_HISTORY_START_MS = int(datetime(2000, 1, 1).timestamp() * 1000)
+
+# Re-request a minute before the watermark; dealId de-duplicates the overlap
+_SYNC_OVERLAP_MS = 60_000
+
+# Each sync is a server round trip — requests arriving together share one
+_SYNC_MAX_AGE_SEC = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ct_deals (
+    account_id INTEGER NOT NULL,
+    deal_id    INTEGER NOT NULL,
+    ts         INTEGER NOT NULL,
+    payload    BLOB    NOT NULL,
+    PRIMARY KEY (account_id, deal_id)
+);
+CREATE INDEX IF NOT EXISTS ct_deals_account_ts ON ct_deals (account_id, ts);
+CREATE TABLE IF NOT EXISTS ct_sync (
+    account_id INTEGER PRIMARY KEY,
+    synced_to  INTEGER NOT NULL
+);
+"""
+
+
+def _decode_proto_deal(payload: bytes):
+    from ctrader_open_api.messages.OpenApiModelMessages_pb2 import ProtoOADeal
+    return ProtoOADeal.FromString(payload)
+
+
+def _deal_ts(deal) -> int:
+    return int(getattr(deal, "executionTimestamp", 0) or getattr(deal, "createTimestamp", 0) or 0)
+
+
+class CtDealStore(VersionedMemo):
+    def __init__(self, db_path: Path = _DB_FILE, decode: Callable = _decode_proto_deal):
+        super().__init__()
+        self._db_path = Path(db_path)
+        self._decode = decode
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._db is None:
+            self._db = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def watermark(self, account_id: int) -> Optional[int]:
+        """executionTimestamp (ms) of the newest stored deal, or None before backfill."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT MAX(ts) FROM ct_deals WHERE account_id = ?", (account_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def synced_to(self, account_id: int) -> Optional[int]:
+        """ms up to which every deal is stored (falls back to the watermark for older stores)."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT synced_to FROM ct_sync WHERE account_id = ?", (account_id,)
+            ).fetchone()
+        return row[0] if row else self.watermark(account_id)
+
+    def mark_synced(self, account_id: int, to_ms: int) -> None:
+        with self._lock:
+            db = self._conn()
+            with db:
+                db.execute(
+                    "INSERT INTO ct_sync VALUES (?, ?) ON CONFLICT(account_id) "
+                    "DO UPDATE SET synced_to = MAX(synced_to, excluded.synced_to)",
+                    (account_id, to_ms),
+                )
+
+    def sync_window(self, account_id: int, max_age: float = _SYNC_MAX_AGE_SEC) -> Optional[tuple]:
+        """
+        (from_ms, to_ms) still to fetch — from synced_to (minus the overlap)
+        to now — or None when the account was synced less than `max_age`
+        seconds ago. Counts as the sync for that throttle.
+        """
+        if not self._sync_due(account_id, max_age):
+            return None
+        mark = self.synced_to(account_id)
+        from_ms = _HISTORY_START_MS if mark is None else mark - _SYNC_OVERLAP_MS
+        return from_ms, int(datetime.utcnow().timestamp() * 1000)
+
+    def add(self, account_id: int, deals: list) -> int:
+        """Store fetched deals (duplicates ignored); returns how many were new."""
+        if not deals:
+            return 0
+        rows = [(account_id, int(d.dealId), _deal_ts(d), d.SerializeToString()) for d in deals]
+        with self._lock:
+            db = self._conn()
+            before = db.total_changes
+            with db:
+                db.executemany("INSERT OR IGNORE INTO ct_deals VALUES (?,?,?,?)", rows)
+            added = db.total_changes - before
+
+        if added:
+            self._bump(account_id)
+        return added
+
+    def deals(self, account_id: int, since_ms: Optional[int] = None,
+              until_ms: Optional[int] = None) -> list:
+        """Stored deals for `account_id`, oldest first; bounds are ms [since, until)."""
+        sql = "SELECT payload FROM ct_deals WHERE account_id = ?"
+        args: list = [account_id]
+        if since_ms is not None:
+            sql += " AND ts >= ?"
+            args.append(since_ms)
+        if until_ms is not None:
+            sql += " AND ts < ?"
+            args.append(until_ms)
+        sql += " ORDER BY ts, deal_id"
+        with self._lock:
+            rows = self._conn().execute(sql, args).fetchall()
+        return [self._decode(r[0]) for r in rows]
+
+    def deals_after(self, account_id: int, rowid: int) -> tuple[int, list]:
+        """(newest rowid for the account, decoded deals stored after `rowid`)."""
+        with self._lock:
+            db = self._conn()
+            head = db.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM ct_deals WHERE account_id = ?", (account_id,)
+            ).fetchone()[0]
+            rows = db.execute(
+                "SELECT payload FROM ct_deals WHERE account_id = ? AND rowid > ? ORDER BY ts, deal_id",
+                (account_id, rowid),
+            ).fetchall()
+        return head, [self._decode(r[0]) for r in rows]
+
+    def history(self, account_id: int, since_ms: Optional[int] = None,
+                until_ms: Optional[int] = None) -> list:
+        """Decoded deals (memoized per version), optionally limited to ms [since, until)."""
+        with self._memo_lock:
+            deals = self.memo(account_id, "deals", lambda: self.deals(account_id))
+            if since_ms is None and until_ms is None:
+                return deals
+            stamps = self.memo(account_id, "deal_ts", lambda: [_deal_ts(d) for d in deals])
+        lo = bisect_left(stamps, since_ms) if since_ms is not None else 0
+        hi = bisect_left(stamps, until_ms) if until_ms is not None else len(deals)
+        return deals[lo:hi]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+store = CtDealStore()
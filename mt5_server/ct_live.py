@@ -0,0 +1,93 @@
+"""
+cTrader → /ws/live bridge.
+
+ct_client callbacks run on the Twisted reactor thread, WebSocketManager on
+the asyncio loop. The reactor side only signals "the snapshot changed"
+through loop.call_soon_threadsafe (at most one wake-up queued at a time);
+the loop side reads ct_client.get_snapshot() and broadcasts it — at once
+if the last push is older than CT_PUSH_INTERVAL, otherwise when the
+interval runs out, so bursts of spot events collapse into one push and the
+latest state always goes out. The payload has the MT5 snapshot shape, so
+the delta protocol and the frontend need nothing broker-specific.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import ct_client
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CtLiveBridge:
+    def __init__(self, interval: Optional[float] = None):
+        self._interval = interval if interval is not None else settings.CT_PUSH_INTERVAL
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws_manager = None
+        self._scheduled = False      # a wake-up is already queued on the loop
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_push = 0.0
+        self.notifications = 0
+        self.pushes = 0
+
+    def start(self, ws_manager, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Call from the event loop once cTrader is connected."""
+        self._ws_manager = ws_manager
+        self._loop = loop or asyncio.get_running_loop()
+        ct_client.set_event_loop(self._loop)
+        ct_client.set_change_listener(self.notify)
+        self.notify()
+
+    def stop(self) -> None:
+        """Any thread; the push task is cancelled on its own loop."""
+        ct_client.set_change_listener(None)
+        ct_client.set_event_loop(None)
+        loop, task = self._loop, self._task
+        self._loop = None
+        self._task = None
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:     # loop already closed (shutdown)
+                pass
+
+    def notify(self) -> None:
+        """Any thread (normally the reactor): the cTrader snapshot changed."""
+        self.notifications += 1
+        loop = self._loop
+        if loop is None or self._scheduled:
+            return
+        self._scheduled = True
+        try:
+            loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:         # loop already closed (shutdown)
+            self._scheduled = False
+
+    def _wake(self) -> None:
+        self._scheduled = False
+        self._dirty = True
+        if self._loop is not None and (self._task is None or self._task.done()):
+            self._task = self._loop.create_task(self._push_loop())
+
+    async def _push_loop(self) -> None:
+        while self._dirty:
+            delay = self._last_push + self._interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._dirty = False
+            self._last_push = time.monotonic()
+            try:
+                await self._ws_manager.broadcast(ct_client.get_snapshot())
+                self.pushes += 1
+            except Exception:
+                logger.exception("cTrader live push failed")
+
+    def stats(self) -> dict:
+        return {"notifications": self.notifications, "pushes": self.pushes, "interval": self._interval}
+
+
+ct_live = CtLiveBridge()
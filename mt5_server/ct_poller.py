@@ -1,14 +1,30 @@
 """
-Async helpers for cTrader data fetching (runs blocking CT calls in executor).
+Async helpers for cTrader data fetching.
+
+Deals are pulled by ct_backfill over the awaitable ct_client.fetch_deal_page
+(no thread waits on the server); only the SQLite/rollup work around it runs
+in the executor.
 """
 
 import asyncio
+import logging
 from datetime import datetime, timedelta
+from typing import Optional
+
+from ct_deal_store import store as deal_store
+from daily_rollup import Exit, rollup
+from single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
 
 _CASHFLOW_CACHE_TTL_SEC = 300
 _cashflow_cache_items: list = []
 _cashflow_cache_ts: float = 0.0
 
+# Deal syncs and cash-flow fetches in flight, keyed by account (see single_flight)
+history_flights = AsyncSingleFlight()
+cashflow_flights = AsyncSingleFlight()
+
 async def get_ct_deals_async(days: int) -> list:
     """
     Fetch CT deal history for `days` days, non-blocking for FastAPI.
@@ -21,12 +37,8 @@ async def get_ct_deals_async(days: int) -> list:
     now      = datetime.utcnow()
     since    = now - timedelta(days=days) if days > 0 else datetime(2000, 1, 1)
     from_ms  = int(since.timestamp() * 1000)
-    to_ms    = int(now.timestamp()   * 1000)
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(
-        None, ct_client.fetch_deals, from_ms, to_ms
-    )
+    return await _sync_and_load(ct_client.get_account_id(), from_ms)
 
 
 async def get_ct_all_deals_async() -> list:
@@ -35,12 +47,192 @@ async def get_ct_all_deals_async() -> list:
     if not ct_client.is_connected():
         return []
 
-    from_ms = int(datetime(2000, 1, 1).timestamp() * 1000)
-    to_ms   = int(datetime.utcnow().timestamp()    * 1000)
+    return await _sync_and_load(ct_client.get_account_id(), None)
+
 
+async def get_ct_equity_curve_async(max_points: Optional[int] = None) -> list:
+    """
+    Balance curve from the shared deal store, computed once per store version
+    (and per point budget, when the curve is downsampled).
+    """
+    import ct_client
+    from ct_data_parser import compute_ct_equity_curve
+    from downsample import point_budget
+    if not ct_client.is_connected():
+        return []
+
+    account_id = ct_client.get_account_id()
+    if account_id is None:
+        return []
+    max_points = point_budget(max_points)
+    await sync_deal_history_async(account_id)
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(
-        None, ct_client.fetch_deals, from_ms, to_ms
+        None, deal_store.memo, account_id, f"equity_curve:{max_points or 0}",
+        lambda: compute_ct_equity_curve(deal_store.history(account_id), max_points),
+    )
+
+
+async def get_ct_calendar_async(year: int, month: int) -> dict:
+    """Month calendar from the deal store; closed months come from calendar_cache."""
+    import ct_client
+    if not ct_client.is_connected():
+        return {"days": {}, "weeks": {}}
+
+    account_id = ct_client.get_account_id()
+    if account_id is None:
+        return {"days": {}, "weeks": {}}
+    await sync_deal_history_async(account_id)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _ct_calendar, account_id, year, month)
+
+
+def _ct_calendar(account_id: int, year: int, month: int) -> dict:
+    from calendar_cache import calendar_cache
+    # Read before the rollup itself, so a cached month is never older than its fingerprint
+    fingerprint = rollup.month_fingerprints("ctrader", account_id, year)[month]
+    return calendar_cache.get_or_compute(
+        "ctrader", account_id, year, month, fingerprint,
+        lambda: _ct_months(account_id, year, [month]).get(month, {"days": {}, "weeks": {}}),
+    )
+
+
+async def get_ct_calendar_year_async(year: int) -> dict:
+    """All 12 months from the daily rollup; unchanged months come from calendar_cache."""
+    import ct_client
+    from calendar_cache import year_payload
+    if not ct_client.is_connected():
+        return year_payload(year, {})
+
+    account_id = ct_client.get_account_id()
+    if account_id is None:
+        return year_payload(year, {})
+    await sync_deal_history_async(account_id)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _ct_calendar_year, account_id, year)
+
+
+def _ct_calendar_year(account_id: int, year: int) -> dict:
+    from calendar_cache import calendar_cache, year_payload
+    fingerprints = rollup.month_fingerprints("ctrader", account_id, year)
+    months = calendar_cache.get_or_compute_year(
+        "ctrader", account_id, year, fingerprints,
+        lambda stale: _ct_months(account_id, year, stale),
+    )
+    return year_payload(year, months)
+
+
+def _ct_months(account_id: int, year: int, months: list) -> dict:
+    """{month: {"days", "weeks"}} read from the daily rollup (O(days))."""
+    from collections import defaultdict
+    from ct_data_parser import _calc_weeks
+    from daily_rollup import calendar_day
+
+    first, last = min(months), max(months)
+    until = f"{year + 1:04d}-01-01" if last == 12 else f"{year:04d}-{last + 1:02d}-01"
+    days = rollup.days("ctrader", account_id, f"{year:04d}-{first:02d}-01", until)
+
+    by_month: dict = defaultdict(dict)
+    for date, row in days.items():
+        month = int(date[5:7])
+        if month in months:
+            by_month[month][date] = calendar_day(row)
+    return {
+        month: {"days": day_data, "weeks": _calc_weeks(year, month, day_data)}
+        for month, day_data in by_month.items()
+    }
+
+
+async def get_ct_statistics_async(days: int) -> dict:
+    """Period statistics summed from the daily rollup."""
+    import ct_client
+    if not ct_client.is_connected():
+        return {"error": "no closed trades", "days": days}
+
+    account_id = ct_client.get_account_id()
+    if account_id is None:
+        return {"error": "no closed trades", "days": days}
+    await sync_deal_history_async(account_id)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _ct_statistics, account_id, days)
+
+
+def _ct_statistics(account_id: int, days: int) -> dict:
+    since = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+    stats = rollup.period_stats("ctrader", account_id, since)
+    if stats is None:
+        return {"error": "no closed trades", "days": days}
+    return {"period_days": days, **stats}
+
+
+async def sync_deal_history_async(account_id: int, max_age: Optional[float] = None) -> int:
+    """
+    Backfill new deals into the store (ct_backfill: windowed, paginated,
+    rate-limited), then fold any not yet seen into the daily rollup.
+    Returns the number of newly stored deals. The server round trips are
+    awaited on the loop; the SQLite work goes to the executor.
+
+    Concurrent calls for the account share one sync. A sync brings the
+    whole history up to date, so it is registered without a range and
+    serves every caller, each reading its own period from the store
+    afterwards. A forced refresh (max_age=0) does not join a sync that is
+    already querying the server.
+    """
+    return await history_flights.do(
+        account_id, lambda: _sync_deal_history(account_id, max_age), fresh=max_age == 0
+    )
+
+
+async def _sync_deal_history(account_id: int, max_age: Optional[float]) -> int:
+    import ct_client
+    from ct_backfill import backfill
+    loop = asyncio.get_event_loop()
+    kwargs = {} if max_age is None else {"max_age": max_age}
+    window = await loop.run_in_executor(None, lambda: deal_store.sync_window(account_id, **kwargs))
+    added = 0
+    if window is not None:
+        from_ms, to_ms = window
+        # Nothing can predate the account — a first backfill from 2000 would
+        # be ~1,400 weekly windows, so none starts without the registration time
+        try:
+            registered = await ct_client.fetch_registration_ms()
+        except Exception as exc:
+            logger.warning(f"cTrader deal sync for {account_id} postponed: {exc!r}")
+        else:
+            run = await backfill(account_id, max(from_ms, registered), to_ms,
+                                 ct_client.fetch_deal_page, deal_store)
+            added = run.added
+            if run.synced_to is not None:
+                await loop.run_in_executor(None, deal_store.mark_synced, account_id, run.synced_to)
+    await loop.run_in_executor(None, _catch_up_rollup, account_id)
+    return added
+
+
+def _catch_up_rollup(account_id: int) -> None:
+    rollup.catch_up(
+        "ctrader", account_id,
+        lambda rowid: deal_store.deals_after(account_id, rowid), _rollup_exits,
+    )
+
+
+def _rollup_exits(deals) -> list:
+    from calendar import timegm
+    from ct_data_parser import _ct_deals_to_rows
+    return [
+        Exit(r["position_id"], timegm(r["time"].utctimetuple()), r["pnl_net"],
+             r["commission"], r["swap"], r["volume"])
+        for r in _ct_deals_to_rows(deals)
+    ]
+
+
+async def _sync_and_load(account_id: Optional[int], since_ms: Optional[int]) -> list:
+    """Fetch only the tail since the store's watermark, then read the shared history."""
+    if account_id is None:
+        return []
+    await sync_deal_history_async(account_id)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        None, lambda: deal_store.history(account_id, since_ms=since_ms)
     )
 
 
@@ -59,11 +251,13 @@ async def get_ct_all_cash_flows_async() -> list:
     from_ms = int(datetime(2000, 1, 1).timestamp() * 1000)
     to_ms = int(datetime.utcnow().timestamp() * 1000)
 
-    loop = asyncio.get_event_loop()
+    async def _fetch() -> list:
+        from ct_backfill import history_bucket
+        await history_bucket.acquire()
+        return await ct_client.fetch_cash_flows(from_ms, to_ms)
+
     try:
-        items = await loop.run_in_executor(
-            None, ct_client.fetch_cash_flows, from_ms, to_ms
-        )
+        items = await cashflow_flights.do(ct_client.get_account_id(), _fetch)
         _cashflow_cache_items = list(items or [])
         _cashflow_cache_ts = now_ts
         return list(_cashflow_cache_items)
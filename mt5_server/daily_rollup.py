@@ -0,0 +1,299 @@
+"""
+Materialized daily P&L rollup (SQLite), shared by the MT5 and cTrader paths.
+
+One row per (broker, account, UTC date) with pnl, trades, wins, losses,
+commission, swap and volume. Calendar views and period statistics read these
+rows — a month is at most 31 of them — instead of re-aggregating raw deals.
+
+The rollup is fed from the deal stores (deal_ledger / ct_deal_store): each
+account keeps the SQLite rowid of the last deal it has seen, and catch_up()
+only applies deals stored after it. That happens when the pollers notice that
+new exit deals have arrived, and after any request-time sync.
+
+A trade is one position within one month, dated by its last exit in that
+month — the same attribution the calendar has always used, so a partial close
+moves the position's P&L (and its win/loss) onto the day of the latest exit.
+
+The database lives in the project root (one level above mt5_server/) so it
+persists across updates that only replace mt5_server/ contents.
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Project root — survives updates
+_DB_FILE = Path(__file__).resolve().parent.parent / "daily_rollup.sqlite3"
+
+# One exit deal as the rollup sees it; ts is epoch seconds (UTC)
+Exit = namedtuple("Exit", "position_id ts pnl commission swap volume")
+
+_DAY_FIELDS = (
+    "pnl", "trades", "wins", "losses", "gross_profit", "gross_loss",
+    "best", "worst", "commission", "swap", "volume",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_positions (
+    broker      TEXT    NOT NULL,
+    account     INTEGER NOT NULL,
+    month       TEXT    NOT NULL,
+    position_id INTEGER NOT NULL,
+    date        TEXT    NOT NULL,
+    pnl         REAL    NOT NULL,
+    commission  REAL    NOT NULL,
+    swap        REAL    NOT NULL,
+    volume      REAL    NOT NULL,
+    PRIMARY KEY (broker, account, month, position_id)
+);
+CREATE INDEX IF NOT EXISTS rollup_positions_day ON rollup_positions (broker, account, date);
+CREATE TABLE IF NOT EXISTS rollup_days (
+    broker       TEXT    NOT NULL,
+    account      INTEGER NOT NULL,
+    date         TEXT    NOT NULL,
+    pnl          REAL    NOT NULL,
+    trades       INTEGER NOT NULL,
+    wins         INTEGER NOT NULL,
+    losses       INTEGER NOT NULL,
+    gross_profit REAL    NOT NULL,
+    gross_loss   REAL    NOT NULL,
+    best         REAL    NOT NULL,
+    worst        REAL    NOT NULL,
+    commission   REAL    NOT NULL,
+    swap         REAL    NOT NULL,
+    volume       REAL    NOT NULL,
+    PRIMARY KEY (broker, account, date)
+);
+CREATE TABLE IF NOT EXISTS rollup_months (
+    broker  TEXT    NOT NULL,
+    account INTEGER NOT NULL,
+    month   TEXT    NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (broker, account, month)
+);
+CREATE TABLE IF NOT EXISTS rollup_marks (
+    broker  TEXT    NOT NULL,
+    account INTEGER NOT NULL,
+    mark    INTEGER NOT NULL,
+    PRIMARY KEY (broker, account)
+);
+"""
+
+_DAY_FROM_POSITIONS = """
+SELECT COALESCE(SUM(pnl), 0), COUNT(*),
+       COALESCE(SUM(pnl > 0), 0), COALESCE(SUM(pnl < 0), 0),
+       COALESCE(SUM(CASE WHEN pnl > 0 THEN pnl ELSE 0 END), 0),
+       COALESCE(-SUM(CASE WHEN pnl < 0 THEN pnl ELSE 0 END), 0),
+       COALESCE(MAX(pnl), 0), COALESCE(MIN(pnl), 0),
+       COALESCE(SUM(commission), 0), COALESCE(SUM(swap), 0), COALESCE(SUM(volume), 0)
+FROM rollup_positions WHERE broker = ? AND account = ? AND date = ?
+"""
+
+
+def calendar_day(row: dict) -> dict:
+    """Rollup day → the {"pnl", "trades", "wins", "losses", "win_rate"} calendar entry."""
+    trades = row["trades"]
+    return {
+        "pnl":      round(row["pnl"], 2),
+        "trades":   trades,
+        "wins":     row["wins"],
+        "losses":   row["losses"],
+        "win_rate": round(row["wins"] / trades * 100, 2) if trades > 0 else 0.0,
+    }
+
+
+class DailyRollup:
+    def __init__(self, db_path: Path = _DB_FILE):
+        self._db_path = Path(db_path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Held across mark read + apply so two catch-ups never apply the same deals
+        self._apply_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._db is None:
+            self._db = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def mark(self, broker: str, account: int) -> int:
+        """Source rowid of the last deal applied for this account (0 = nothing yet)."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT mark FROM rollup_marks WHERE broker = ? AND account = ?",
+                (broker, account),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def catch_up(self, broker: str, account: int, read_after: Callable,
+                 to_exits: Callable[[list], Iterable[Exit]]) -> int:
+        """
+        Apply deals stored since the last mark. `read_after(rowid)` returns
+        (newest rowid in the source, deals after `rowid`); `to_exits` turns
+        those deals into Exit rows. Returns the number of days touched.
+        """
+        with self._apply_lock:
+            mark = self.mark(broker, account)
+            head, deals = read_after(mark)
+            if head < mark:
+                # Source store was rebuilt (e.g. its file was deleted) — start over
+                logger.info(f"Daily rollup for {broker}:{account} rebuilt from scratch")
+                self.reset(broker, account)
+                mark = 0
+                head, deals = read_after(0)
+            if head == mark:
+                return 0
+            return self.apply(broker, account, to_exits(deals), head)
+
+    def apply(self, broker: str, account: int, exits: Iterable[Exit], mark: int) -> int:
+        """Fold exit deals into the rollup and advance the mark. Returns days touched."""
+        # Combine the batch per (month, position) first — a backfill is one pass
+        batch: dict = {}
+        for e in exits:
+            date = datetime.utcfromtimestamp(e.ts).date().isoformat()
+            key = (date[:7], int(e.position_id))
+            cur = batch.get(key)
+            if cur is None:
+                batch[key] = [date, e.pnl, e.commission, e.swap, e.volume]
+            else:
+                cur[0] = max(cur[0], date)
+                cur[1] += e.pnl
+                cur[2] += e.commission
+                cur[3] += e.swap
+                cur[4] += e.volume
+
+        touched: set = set()
+        with self._lock:
+            db = self._conn()
+            with db:
+                for (month, position_id), (date, pnl, comm, swap, vol) in batch.items():
+                    old = db.execute(
+                        "SELECT date, pnl, commission, swap, volume FROM rollup_positions "
+                        "WHERE broker = ? AND account = ? AND month = ? AND position_id = ?",
+                        (broker, account, month, position_id),
+                    ).fetchone()
+                    if old is not None:
+                        touched.add(old[0])
+                        date = max(date, old[0])
+                        pnl, comm, swap, vol = pnl + old[1], comm + old[2], swap + old[3], vol + old[4]
+                    touched.add(date)
+                    db.execute(
+                        "INSERT OR REPLACE INTO rollup_positions VALUES (?,?,?,?,?,?,?,?,?)",
+                        (broker, account, month, position_id, date, pnl, comm, swap, vol),
+                    )
+
+                for date in touched:
+                    day = db.execute(_DAY_FROM_POSITIONS, (broker, account, date)).fetchone()
+                    if day[1] == 0:
+                        db.execute(
+                            "DELETE FROM rollup_days WHERE broker = ? AND account = ? AND date = ?",
+                            (broker, account, date),
+                        )
+                    else:
+                        db.execute(
+                            "INSERT OR REPLACE INTO rollup_days VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                            (broker, account, date, *day),
+                        )
+                for month in {month for month, _ in batch}:
+                    db.execute(
+                        "INSERT INTO rollup_months VALUES (?,?,?,1) ON CONFLICT(broker, account, month) "
+                        "DO UPDATE SET version = version + 1",
+                        (broker, account, month),
+                    )
+                db.execute(
+                    "INSERT OR REPLACE INTO rollup_marks VALUES (?,?,?)", (broker, account, mark)
+                )
+        return len(touched)
+
+    def month_fingerprints(self, broker: str, account: int, year: int) -> dict:
+        """
+        {1..12: fingerprint} of one year's months — changes whenever apply()
+        folds deals into that month. calendar_cache keys its entries on it,
+        so a cached month is always older than (or as new as) its fingerprint.
+        """
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT month, version FROM rollup_months WHERE broker = ? AND account = ? "
+                "AND month >= ? AND month < ?",
+                (broker, account, f"{year:04d}-01", f"{year + 1:04d}-01"),
+            ).fetchall()
+        versions = {int(month[5:7]): version for month, version in rows}
+        return {month: f"rollup:{versions.get(month, 0)}" for month in range(1, 13)}
+
+    def days(self, broker: str, account: int, since: Optional[str] = None,
+             until: Optional[str] = None) -> dict:
+        """{"YYYY-MM-DD": row} for dates in [since, until), oldest first."""
+        sql = f"SELECT date, {', '.join(_DAY_FIELDS)} FROM rollup_days WHERE broker = ? AND account = ?"
+        args: list = [broker, account]
+        if since is not None:
+            sql += " AND date >= ?"
+            args.append(since)
+        if until is not None:
+            sql += " AND date < ?"
+            args.append(until)
+        sql += " ORDER BY date"
+        with self._lock:
+            rows = self._conn().execute(sql, args).fetchall()
+        return {r[0]: dict(zip(_DAY_FIELDS, r[1:])) for r in rows}
+
+    def period_stats(self, broker: str, account: int, since: Optional[str] = None) -> Optional[dict]:
+        """
+        Trade statistics for all days from `since` (inclusive), in the shape of
+        parse_statistics() minus "period_days". None when no trade closed.
+        """
+        sql = (
+            "SELECT COALESCE(SUM(trades), 0), COALESCE(SUM(wins), 0), COALESCE(SUM(losses), 0), "
+            "COALESCE(SUM(pnl), 0), COALESCE(SUM(gross_profit), 0), COALESCE(SUM(gross_loss), 0), "
+            "MAX(best), MIN(worst), COALESCE(SUM(commission), 0), COALESCE(SUM(swap), 0) "
+            "FROM rollup_days WHERE broker = ? AND account = ?"
+        )
+        args: list = [broker, account]
+        if since is not None:
+            sql += " AND date >= ?"
+            args.append(since)
+        with self._lock:
+            total, wins, losses, net, gp, gl, best, worst, comm, swap = \
+                self._conn().execute(sql, args).fetchone()
+        if total == 0:
+            return None
+        return {
+            "total_trades":     total,
+            "winning_trades":   wins,
+            "losing_trades":    losses,
+            "win_rate_pct":     round(wins / total * 100, 2),
+            "net_profit":       round(net, 2),
+            "gross_profit":     round(gp, 2),
+            "gross_loss":       round(gl, 2),
+            "profit_factor":    round(gp / gl, 2) if gl > 0 else None,
+            "avg_win":          round(gp / wins, 2) if wins > 0 else 0,
+            "avg_loss":         round(-gl / losses, 2) if losses > 0 else 0,
+            "best_trade":       round(best, 2),
+            "worst_trade":      round(worst, 2),
+            "total_commission": round(comm, 2),
+            "total_swap":       round(swap, 2),
+        }
+
+    def reset(self, broker: str, account: int) -> None:
+        # rollup_months is kept: the rebuild bumps the versions past what
+        # calendar_cache has seen
+        with self._lock:
+            db = self._conn()
+            with db:
+                for table in ("rollup_positions", "rollup_days", "rollup_marks"):
+                    db.execute(f"DELETE FROM {table} WHERE broker = ? AND account = ?", (broker, account))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+rollup = DailyRollup()
@@ -1,9 +1,10 @@
-import MetaTrader5 as mt5
-import pandas as pd
-from datetime import datetime
 from calendar import monthrange
 from collections import defaultdict
 
+from calendar_cache import calendar_cache, year_payload
+from daily_rollup import calendar_day, rollup
+from data_parser import sync_history, terminal_account
+
 
 def get_calendar_data(year: int, month: int) -> dict:
     """
@@ -19,61 +20,59 @@ def get_calendar_data(year: int, month: int) -> dict:
       }
     }
     """
-    date_from = datetime(year, month, 1)
-    if month == 12:
-        date_to = datetime(year + 1, 1, 1)
-    else:
-        date_to = datetime(year, month + 1, 1)
-
-    deals = mt5.history_deals_get(date_from, date_to)
-    if not deals:
+    info = terminal_account()
+    if info is None:
         return {"days": {}, "weeks": {}}
+    sync_history(info.login)
 
-    rows = []
-    for d in deals:
-        rows.append({
-            "position_id": d.position_id,
-            "symbol":      d.symbol,
-            "type":        d.type,
-            "entry":       d.entry,
-            "profit":      d.profit,
-            "swap":        d.swap,
-            "commission":  d.commission,
-            "pnl_net":     d.profit + d.swap + d.commission,
-            "time":        datetime.utcfromtimestamp(d.time),
-        })
-
-    df = pd.DataFrame(rows)
-
-    # Tylko zamknięcia pozycji (entry == 1) i ruch powrotny CFD (entry == 2)
-    exits = df[df["entry"].isin([1, 2])].copy()
-
-    if exits.empty:
-        return {"days": {}, "weeks": {}}
+    # Zamknięte miesiące się nie zmieniają — liczone ponownie (z dziennego
+    # rollupu) tylko wtedy, gdy rollup dołoży do tego miesiąca nowy deal.
+    # Odcisk jest czytany przed danymi, więc wpis nigdy nie jest starszy od niego.
+    fingerprint = rollup.month_fingerprints("mt5", info.login, year)[month]
+    return calendar_cache.get_or_compute(
+        "mt5", info.login, year, month, fingerprint,
+        lambda: _compute_months(info.login, year, [month]).get(month, {"days": {}, "weeks": {}}),
+    )
+
+
+def get_calendar_year(year: int) -> dict:
+    """
+    Wszystkie 12 miesięcy roku naraz (dni, tygodnie, sumy miesięczne):
+    jedna synchronizacja rejestru i jeden odczyt dni roku z rollupu.
+    Przeliczane są tylko miesiące, których odcisk się zmienił.
+    """
+    info = terminal_account()
+    if info is None:
+        return year_payload(year, {})
+    sync_history(info.login)
 
-    # Agreguj wiele deali tej samej pozycji (np. częściowe zamknięcia)
-    trades = exits.groupby("position_id").agg(
-        pnl_net=("pnl_net", "sum"),
-        close_time=("time", "last"),
-    ).reset_index()
-
-    trades["date"] = trades["close_time"].dt.date
-
-    day_data = {}
-    for date, group in trades.groupby("date"):
-        wins   = int((group["pnl_net"] > 0).sum())
-        losses = int((group["pnl_net"] < 0).sum())
-        total  = len(group)
-        day_data[str(date)] = {
-            "pnl":      round(float(group["pnl_net"].sum()), 2),
-            "trades":   total,
-            "wins":     wins,
-            "losses":   losses,
-            "win_rate": round(wins / total * 100, 2) if total > 0 else 0.0,
-        }
-
-    week_data = _calc_weeks(year, month, day_data)
-    return {"days": day_data, "weeks": week_data}
+    fingerprints = rollup.month_fingerprints("mt5", info.login, year)
+    months = calendar_cache.get_or_compute_year(
+        "mt5", info.login, year, fingerprints,
+        lambda stale: _compute_months(info.login, year, stale),
+    )
+    return year_payload(year, months)
+
+
+def _compute_months(login: int, year: int, months: list) -> dict:
+    """
+    {miesiąc: {"days", "weeks"}} z dziennego rollupu — O(dni), nie O(deali).
+    Pozycja jest przypisana do dnia ostatniego zamknięcia w danym miesiącu.
+    """
+    first, last = min(months), max(months)
+    until = f"{year + 1:04d}-01-01" if last == 12 else f"{year:04d}-{last + 1:02d}-01"
+    days = rollup.days("mt5", login, f"{year:04d}-{first:02d}-01", until)
+
+    by_month: dict = defaultdict(dict)
+    for date, row in days.items():
+        month = int(date[5:7])
+        if month in months:
+            by_month[month][date] = calendar_day(row)
+
+    return {
+        month: {"days": day_data, "weeks": _calc_weeks(year, month, day_data)}
+        for month, day_data in by_month.items()
+    }
 
 
 def _calc_weeks(year: int, month: int, day_data: dict) -> dict:
@@ -0,0 +1,350 @@
+"""
+Columnar deal representation for the MT5 statistics pipeline.
+
+Deals are held in a NumPy structured array (int64 times, float64 money) built
+once from the history_deals_get tuples. Trades (one row per position) and all
+Myfxbook-style statistics are then derived with vector operations instead of
+per-trade dicts and list comprehensions.
+
+This module does not import MetaTrader5 — symbol lookups are passed in.
+"""
+
+import math
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+
+DEAL_DTYPE = np.dtype([
+    ("ticket",      np.int64),
+    ("position_id", np.int64),
+    ("time",        np.int64),
+    ("type",        np.int16),
+    ("entry",       np.int16),
+    ("symbol",      "U32"),
+    ("volume",      np.float64),
+    ("price",       np.float64),
+    ("profit",      np.float64),
+    ("swap",        np.float64),
+    ("commission",  np.float64),
+])
+
+TRADE_DTYPE = np.dtype([
+    ("position_id", np.int64),
+    ("symbol",      "U32"),
+    ("is_buy",      np.bool_),
+    ("open_time",   np.int64),
+    ("close_time",  np.int64),
+    ("open_price",  np.float64),
+    ("close_price", np.float64),
+    ("volume",      np.float64),
+    ("profit",      np.float64),
+    ("swap",        np.float64),
+    ("commission",  np.float64),
+    ("pnl_net",     np.float64),
+    ("pips",        np.float64),
+])
+
+DEAL_TYPE_BUY     = 0
+DEAL_TYPE_BALANCE = 2
+DEAL_ENTRY_IN     = 0
+EXIT_ENTRIES      = (1, 2)     # DEAL_ENTRY_OUT, DEAL_ENTRY_INOUT
+
+_DEFAULT_PIP = 0.0001
+
+
+def deals_to_array(deals) -> np.ndarray:
+    """MT5 TradeDeal tuples (or ledger rows) → structured array sorted by time."""
+    arr = np.array(
+        [
+            (d.ticket, d.position_id, d.time, d.type, d.entry, d.symbol or "",
+             d.volume, d.price, d.profit, d.swap, d.commission)
+            for d in deals or ()
+        ],
+        dtype=DEAL_DTYPE,
+    )
+    return arr[np.argsort(arr["time"], kind="stable")]
+
+
+def exit_mask(deals: np.ndarray) -> np.ndarray:
+    return np.isin(deals["entry"], EXIT_ENTRIES)
+
+
+def balance_deltas(deals: np.ndarray) -> np.ndarray:
+    """Per-deal change of account balance: deposits/withdrawals and closed P&L."""
+    closed = deals["profit"] + deals["commission"] + deals["swap"]
+    return np.where(
+        deals["type"] == DEAL_TYPE_BALANCE,
+        deals["profit"],
+        np.where(exit_mask(deals), closed, 0.0),
+    )
+
+
+class BalanceIndex:
+    """
+    Prefix sums over the balance-moving deals (cash flows and exits):
+    sorted times next to the running balance and running net deposits.
+    The balance at any moment is one binary search instead of a pass over
+    the whole history.
+    """
+
+    def __init__(self, deals: np.ndarray):
+        moves = (deals["type"] == DEAL_TYPE_BALANCE) | exit_mask(deals)
+        d = deals[moves]
+        is_cash = d["type"] == DEAL_TYPE_BALANCE
+        cash = np.where(is_cash, d["profit"], 0.0)
+
+        self.times        = d["time"]
+        self.balance      = np.cumsum(balance_deltas(d))
+        self.net_deposits = np.cumsum(cash)
+        self.deposits     = float(cash[cash >= 0].sum())
+        self.withdrawals  = float(-cash[cash < 0].sum())
+
+        exits = np.flatnonzero(~is_cash)
+        self.first_trade_ts = int(self.times[exits[0]]) if exits.size else None
+        self._max_dd_pct = _max_drawdown_pct(self.balance, 0.0)
+
+    def __len__(self) -> int:
+        return int(self.times.size)
+
+    def _count_before(self, ts) -> int:
+        return int(np.searchsorted(self.times, ts, side="left"))
+
+    def balance_at(self, ts) -> float:
+        """Balance from deals strictly before `ts` (epoch seconds)."""
+        i = self._count_before(ts)
+        return float(self.balance[i - 1]) if i else 0.0
+
+    def net_deposits_at(self, ts) -> float:
+        i = self._count_before(ts)
+        return float(self.net_deposits[i - 1]) if i else 0.0
+
+    def gain_pct(self, since, until=None) -> float:
+        """Balance change over [since, until) relative to the balance at `since`."""
+        start = self.balance_at(since)
+        end = self.balance_at(until) if until is not None else (
+            float(self.balance[-1]) if len(self) else 0.0
+        )
+        return (end - start) / abs(start) * 100 if start != 0 else 0.0
+
+    def max_drawdown_pct(self, since=None, until=None) -> float:
+        """Largest peak-to-trough fall of the balance, in % of the peak."""
+        if since is None and until is None:
+            return self._max_dd_pct
+        lo = self._count_before(since) if since is not None else 0
+        hi = self._count_before(until) if until is not None else len(self)
+        start = float(self.balance[lo - 1]) if lo else 0.0
+        return _max_drawdown_pct(self.balance[lo:hi], start)
+
+
+def _max_drawdown_pct(balance: np.ndarray, start: float) -> float:
+    if balance.size == 0:
+        return 0.0
+    peak = np.maximum.accumulate(np.maximum(balance, max(start, 0.0)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (peak - balance) / peak * 100, 0.0)
+    return float(dd.max())
+
+
+def _group_boundary(groups: np.ndarray, first: bool) -> np.ndarray:
+    """Mask of first (or last) element of each run in a non-decreasing array."""
+    if groups.size == 0:
+        return np.zeros(0, dtype=bool)
+    change = groups[1:] != groups[:-1]
+    if first:
+        return np.concatenate(([True], change))
+    return np.concatenate((change, [True]))
+
+
+def _pick_per_group(group: np.ndarray, mask: np.ndarray, n: int, first: bool) -> np.ndarray:
+    """Index of the first/last masked row of every group, -1 where there is none."""
+    out = np.full(n, -1, dtype=np.int64)
+    idx = np.flatnonzero(mask)
+    g = group[idx]
+    sel = _group_boundary(g, first)
+    out[g[sel]] = idx[sel]
+    return out
+
+
+def aggregate_trades(deals: np.ndarray, pip_size_of: Callable[[str], float]) -> np.ndarray:
+    """
+    Group deals by position_id into one trade per position (partial closes,
+    separate commission deals and INOUT handled like the old per-dict code).
+    `pip_size_of(symbol)` is called once per distinct symbol.
+    Returns a TRADE_DTYPE array sorted by close time.
+    """
+    d = deals[(deals["type"] != DEAL_TYPE_BALANCE) & (deals["position_id"] != 0)]
+    if d.size == 0:
+        return np.empty(0, dtype=TRADE_DTYPE)
+
+    d = d[np.lexsort((d["time"], d["position_id"]))]
+    pos_ids, starts, group = np.unique(d["position_id"], return_index=True, return_inverse=True)
+    n = pos_ids.size
+
+    is_exit   = exit_mask(d)
+    entry_idx = _pick_per_group(group, d["entry"] == DEAL_ENTRY_IN, n, first=True)
+    exit_idx  = _pick_per_group(group, is_exit, n, first=False)
+    valid     = (entry_idx >= 0) & (exit_idx >= 0)
+
+    def group_sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(group, weights=values, minlength=n)[valid]
+
+    profit     = group_sum(np.where(is_exit, d["profit"], 0.0))
+    volume     = group_sum(np.where(is_exit, d["volume"], 0.0))
+    swap       = group_sum(d["swap"])
+    commission = group_sum(d["commission"])
+
+    e = entry_idx[valid]
+    x = exit_idx[valid]
+    trades = np.empty(e.size, dtype=TRADE_DTYPE)
+    trades["position_id"] = pos_ids[valid]
+    trades["symbol"]      = d["symbol"][e]
+    trades["is_buy"]      = d["type"][e] == DEAL_TYPE_BUY
+    trades["open_time"]   = d["time"][e]
+    trades["close_time"]  = d["time"][x]
+    trades["open_price"]  = d["price"][e]
+    trades["close_price"] = d["price"][x]
+    trades["volume"]      = np.round(volume, 2)
+    trades["profit"]      = np.round(profit, 2)
+    trades["swap"]        = np.round(swap, 2)
+    trades["commission"]  = np.round(commission, 2)
+    trades["pnl_net"]     = np.round(profit + swap + commission, 2)
+
+    symbols, inverse = np.unique(trades["symbol"], return_inverse=True)
+    pip = np.array([pip_size_of(str(s)) for s in symbols], dtype=np.float64)
+    pip = np.where(pip > 0, pip, _DEFAULT_PIP)[inverse]
+    direction = np.where(trades["is_buy"], 1.0, -1.0)
+    trades["pips"] = np.round((trades["close_price"] - trades["open_price"]) * direction / pip, 1)
+
+    # Order by close time; ties keep the position's first appearance in history
+    first_seen = d["time"][starts][valid]
+    return trades[np.lexsort((first_seen, trades["close_time"]))]
+
+
+def _iso(ts) -> str:
+    return datetime.utcfromtimestamp(int(ts)).isoformat()
+
+
+def _mean(values: np.ndarray) -> float:
+    return float(values.mean()) if values.size else 0.0
+
+
+def _norm_cdf(x: float) -> float:
+    return (1.0 + math.erf(x / math.sqrt(2.0))) / 2.0
+
+
+def _runs_z_score(won: np.ndarray) -> tuple[float, float]:
+    """Wald–Wolfowitz runs test over the win/loss sequence → (Z, probability %)."""
+    N = int(won.size)
+    W = int(won.sum())
+    L = N - W
+    if W == 0 or L == 0 or N <= 2:
+        return 0.0, 0.0
+    R         = int(np.count_nonzero(won[1:] != won[:-1])) + 1
+    exp_R     = (2 * W * L / N) + 1
+    var_R_num = 2 * W * L * (2 * W * L - N)
+    var_R_den = N ** 2 * (N - 1)
+    if var_R_den <= 0 or var_R_num / var_R_den <= 0:
+        return 0.0, 0.0
+    z = round((R - exp_R) / math.sqrt(var_R_num / var_R_den), 2)
+    return z, round(_norm_cdf(abs(z)) * 100, 2)
+
+
+def _holding_period_returns(pnl: np.ndarray, balance_start: float,
+                            balance_end: float) -> tuple[float, float]:
+    """AHPR / GHPR in % — each trade's return on the balance right before it."""
+    base = balance_start if balance_start > 0 else balance_end
+    before = base + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    ok = before > 0
+    if not ok.any():
+        return 0.0, 0.0
+    returns = pnl[ok] / before[ok]
+    ahpr = round(float(returns.mean()) * 100, 4)
+    growth = 1.0 + returns
+    if (growth <= 0).any():
+        ghpr = -100.0
+    else:
+        ghpr = round(float(np.expm1(np.log(growth).mean())) * 100, 4)
+    return ahpr, ghpr
+
+
+def trade_stats(trades: np.ndarray, balance_start: float, balance_end: float) -> dict:
+    """Myfxbook-style statistics over a non-empty TRADE_DTYPE array."""
+    pnl  = trades["pnl_net"]
+    pips = trades["pips"]
+    won  = pnl > 0
+    lost = pnl < 0
+    buy  = trades["is_buy"]
+
+    total_trades = int(pnl.size)
+    n_wins   = int(won.sum())
+    n_losses = int(lost.sum())
+    win_rate = n_wins / total_trades if total_trades else 0.0
+    gain_pct = ((balance_end - balance_start) / abs(balance_start) * 100) if balance_start != 0 else 0.0
+
+    avg_win_eur   = _mean(pnl[won])
+    avg_loss_eur  = _mean(pnl[lost])
+    avg_win_pips  = _mean(pips[won])
+    avg_loss_pips = _mean(pips[lost])
+
+    n_longs      = int(buy.sum())
+    n_shorts     = total_trades - n_longs
+    n_longs_won  = int((buy & won).sum())
+    n_shorts_won = int((~buy & won).sum())
+
+    best_i  = int(np.argmax(pnl))
+    worst_i = int(np.argmin(pnl))
+
+    gross_profit  = float(pnl[won].sum())
+    gross_loss    = abs(float(pnl[lost].sum()))
+    profit_factor = round(gross_profit / gross_loss, 2) if gross_loss > 0 else None
+
+    std_dev = round(float(pnl.std(ddof=1)), 2) if total_trades > 1 else 0.0
+    sharpe  = round(float(pnl.mean()) / std_dev, 2) if std_dev > 0 else 0.0
+
+    z_score, z_prob = _runs_z_score(won)
+
+    durations = trades["close_time"] - trades["open_time"]
+    durations = durations[durations > 0]
+    avg_dur   = int(round(float(durations.mean()))) if durations.size else 0
+
+    ahpr, ghpr = _holding_period_returns(pnl, balance_start, balance_end)
+
+    return {
+        "gain_pct":        round(gain_pct, 2),
+        "profit":          round(float(pnl.sum()), 2),
+        "pips":            round(float(pips.sum()), 1),
+        "win_rate_pct":    round(win_rate * 100, 1),
+        "total_trades":    total_trades,
+        "total_lots":      round(float(trades["volume"].sum()), 2),
+        "winning_trades":  n_wins,
+        "losing_trades":   n_losses,
+        "avg_win_eur":     round(avg_win_eur, 2),
+        "avg_loss_eur":    round(avg_loss_eur, 2),
+        "avg_win_pips":    round(avg_win_pips, 1),
+        "avg_loss_pips":   round(avg_loss_pips, 1),
+        "longs_total":     n_longs,
+        "longs_won":       n_longs_won,
+        "longs_win_pct":   round(n_longs_won / n_longs * 100, 1) if n_longs else 0.0,
+        "shorts_total":    n_shorts,
+        "shorts_won":      n_shorts_won,
+        "shorts_win_pct":  round(n_shorts_won / n_shorts * 100, 1) if n_shorts else 0.0,
+        "best_trade_eur":   float(pnl[best_i]),
+        "best_trade_date":  _iso(trades["close_time"][best_i]),
+        "best_trade_pips":  float(pips.max()),
+        "worst_trade_eur":  float(pnl[worst_i]),
+        "worst_trade_date": _iso(trades["close_time"][worst_i]),
+        "worst_trade_pips": float(pips.min()),
+        "profit_factor":   profit_factor,
+        "std_dev":         std_dev,
+        "sharpe_ratio":    sharpe,
+        "z_score":         z_score,
+        "z_probability":   z_prob,
+        "expectancy_eur":  round(win_rate * avg_win_eur  + (1 - win_rate) * avg_loss_eur,  2),
+        "expectancy_pips": round(win_rate * avg_win_pips + (1 - win_rate) * avg_loss_pips, 1),
+        "avg_trade_sec":   avg_dur,
+        "gross_profit":    round(gross_profit, 2),
+        "gross_loss":      round(gross_loss, 2),
+        "ahpr_pct":        ahpr,
+        "ghpr_pct":        ghpr,
+    }
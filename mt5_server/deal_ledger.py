@@ -0,0 +1,219 @@
+"""
+Persistent, incremental MT5 deal ledger (SQLite).
+
+The first request for an account backfills its whole deal history once;
+every later request only asks the terminal for deals newer than the
+ledger's watermark (the newest stored deal time). Rows are keyed by
+(login, ticket), so overlapping fetch windows never create duplicates.
+
+`ledger` is the single process-wide instance. Each account has a version
+that changes only when a sync stores new deals; results derived from the
+history (columnar arrays, trades, curves) are memoized per version, so one
+dashboard load computes each of them at most once.
+
+The database lives in the project root (one level above mt5_server/) so it
+persists across updates that only replace mt5_server/ contents.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+
+from deal_columns import deals_to_array
+
+logger = logging.getLogger(__name__)
+
+# Project root — survives updates
+_DB_FILE = Path(__file__).resolve().parent.parent / "deal_ledger.sqlite3"
+
+# First backfill starts here (same lower bound the parsers used before)
+_HISTORY_START = datetime(2000, 1, 1)
+
+# Re-read this much history before the watermark on every sync. Deal times are
+# in trade-server time, which may be ahead of UTC, and several deals can share
+# the same second; the primary key drops the duplicates.
+_SYNC_OVERLAP = timedelta(days=1)
+
+# Requests arriving together (overview, curve, stats…) share one terminal sync
+_SYNC_MAX_AGE_SEC = 2.0
+
+_FIELDS = (
+    "ticket", "position_id", "time", "type", "entry", "symbol",
+    "volume", "price", "profit", "swap", "commission",
+)
+
+# Same attribute names as MetaTrader5.TradeDeal, so parsers accept either
+Deal = namedtuple("Deal", _FIELDS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mt5_deals (
+    login       INTEGER NOT NULL,
+    ticket      INTEGER NOT NULL,
+    position_id INTEGER NOT NULL,
+    time        INTEGER NOT NULL,
+    type        INTEGER NOT NULL,
+    entry       INTEGER NOT NULL,
+    symbol      TEXT    NOT NULL,
+    volume      REAL    NOT NULL,
+    price       REAL    NOT NULL,
+    profit      REAL    NOT NULL,
+    swap        REAL    NOT NULL,
+    commission  REAL    NOT NULL,
+    PRIMARY KEY (login, ticket)
+);
+CREATE INDEX IF NOT EXISTS mt5_deals_login_time ON mt5_deals (login, time);
+"""
+
+
+class VersionedMemo:
+    """Per-account version counter and a cache of results derived from it."""
+
+    def __init__(self):
+        self._versions: dict = {}
+        self._memo: dict = {}
+        self._last_sync: dict = {}
+        # Re-entrant: a derived value may be built from another memoized one
+        self._memo_lock = threading.RLock()
+
+    def version(self, key: Hashable) -> int:
+        return self._versions.get(key, 0)
+
+    def _bump(self, key: Hashable) -> None:
+        with self._memo_lock:
+            self._versions[key] = self.version(key) + 1
+
+    def _sync_due(self, key: Hashable, max_age: float) -> bool:
+        now = time.monotonic()
+        last = self._last_sync.get(key)
+        if last is not None and now - last < max_age:
+            return False
+        self._last_sync[key] = now
+        return True
+
+    def memo(self, key: Hashable, name: str, compute: Callable[[], Any]) -> Any:
+        """Return `compute()`, evaluated at most once per version of `key`."""
+        with self._memo_lock:
+            version = self.version(key)
+            hit = self._memo.get((key, name))
+            if hit is not None and hit[0] == version:
+                return hit[1]
+            value = compute()
+            self._memo[(key, name)] = (version, value)
+            return value
+
+
+class DealLedger(VersionedMemo):
+    def __init__(self, db_path: Path = _DB_FILE):
+        super().__init__()
+        self._db_path = Path(db_path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        # Called with self._lock held
+        if self._db is None:
+            self._db = sqlite3.connect(str(self._db_path), check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def watermark(self, login: int) -> Optional[int]:
+        """Time (epoch seconds) of the newest stored deal, or None before backfill."""
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT MAX(time) FROM mt5_deals WHERE login = ?", (login,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def sync(self, login: int, fetch: Callable, max_age: float = _SYNC_MAX_AGE_SEC) -> int:
+        """
+        Pull new deals for `login` through `fetch(date_from, date_to)`
+        (mt5.history_deals_get). Returns the number of newly stored deals.
+        Skipped when the account was synced less than `max_age` seconds ago.
+        """
+        if not self._sync_due(login, max_age):
+            return 0
+        mark = self.watermark(login)
+        if mark is None:
+            date_from = _HISTORY_START
+        else:
+            date_from = datetime.utcfromtimestamp(mark) - _SYNC_OVERLAP
+        # Server time may run ahead of UTC — look a day into the "future" too
+        date_to = datetime.utcnow() + timedelta(days=1)
+
+        deals = fetch(date_from, date_to)
+        if not deals:
+            return 0
+
+        rows = [
+            (login, d.ticket, d.position_id, int(d.time), d.type, d.entry, d.symbol or "",
+             d.volume, d.price, d.profit, d.swap, d.commission)
+            for d in deals
+        ]
+        with self._lock:
+            db = self._conn()
+            before = db.total_changes
+            with db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO mt5_deals VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+                    rows,
+                )
+            added = db.total_changes - before
+
+        if added:
+            self._bump(login)
+        if mark is None:
+            logger.info(f"Deal ledger backfilled for {login}: {added} deals")
+        return added
+
+    def deals(self, login: int, since: Optional[int] = None,
+              until: Optional[int] = None) -> list:
+        """Stored deals for `login`, oldest first; bounds are epoch seconds [since, until)."""
+        sql = f"SELECT {', '.join(_FIELDS)} FROM mt5_deals WHERE login = ?"
+        args: list = [login]
+        if since is not None:
+            sql += " AND time >= ?"
+            args.append(since)
+        if until is not None:
+            sql += " AND time < ?"
+            args.append(until)
+        sql += " ORDER BY time, ticket"
+        with self._lock:
+            rows = self._conn().execute(sql, args).fetchall()
+        return [Deal(*r) for r in rows]
+
+    def deals_after(self, login: int, rowid: int) -> tuple[int, list]:
+        """
+        (newest rowid for `login`, deals stored after `rowid`) — lets the
+        daily rollup pick up exactly the deals it has not seen yet.
+        """
+        with self._lock:
+            db = self._conn()
+            head = db.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM mt5_deals WHERE login = ?", (login,)
+            ).fetchone()[0]
+            rows = db.execute(
+                f"SELECT {', '.join(_FIELDS)} FROM mt5_deals "
+                "WHERE login = ? AND rowid > ? ORDER BY time, ticket",
+                (login, rowid),
+            ).fetchall()
+        return head, [Deal(*r) for r in rows]
+
+    def array(self, login: int) -> np.ndarray:
+        """Whole history of `login` as a DEAL_DTYPE array (shared — do not modify)."""
+        return self.memo(login, "deals", lambda: deals_to_array(self.deals(login)))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+ledger = DealLedger()
@@ -0,0 +1,59 @@
+"""
+Shape-preserving downsampling for chart series (min/max bucketing).
+
+The series is split into equal-count buckets and each bucket keeps only its
+lowest and highest point, in time order; the first and last points are always
+kept. Every local peak and trough that is the extreme of its bucket survives,
+including the global maximum and minimum, so drawdowns still show at any
+resolution — unlike plain striding, which can step over them.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Point budgets a request is rounded down to. Curves are memoized per budget,
+# so a fixed set keeps the cache bounded whatever clients ask for.
+POINT_BUDGETS = (10, 100, 250, 500, 1000, 2000, 5000)
+
+
+def point_budget(max_points: Optional[int]) -> Optional[int]:
+    """Largest POINT_BUDGETS entry not above `max_points` (None = no downsampling)."""
+    if not max_points:
+        return None
+    max_points = min(max_points, POINT_BUDGETS[-1])
+    fitting = [b for b in POINT_BUDGETS if b <= max_points]
+    return fitting[-1] if fitting else POINT_BUDGETS[0]
+
+
+def minmax_indices(values, max_points: int) -> np.ndarray:
+    """Sorted indices of at most `max_points` points that keep the series' shape."""
+    values = np.asarray(values, dtype=np.float64)
+    n = values.size
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+    if max_points < 4:
+        # No room for a single min/max bucket — endpoints only
+        return np.array([0, n - 1])
+
+    inner = values[1:-1]
+    buckets = (max_points - 2) // 2
+    bucket = np.arange(inner.size) * buckets // inner.size
+
+    # Within each bucket: first row after sorting by value is the minimum,
+    # last row is the maximum
+    order = np.lexsort((inner, bucket))
+    sorted_bucket = bucket[order]
+    first = np.concatenate(([True], sorted_bucket[1:] != sorted_bucket[:-1]))
+    last = np.concatenate((sorted_bucket[1:] != sorted_bucket[:-1], [True]))
+
+    keep = np.concatenate(([0], order[first] + 1, order[last] + 1, [n - 1]))
+    return np.unique(keep)
+
+
+def downsample(points: list, max_points: Optional[int], key: str = "balance") -> list:
+    """Subset of `points` (dicts) chosen by minmax_indices on `points[i][key]`."""
+    if not max_points or len(points) <= max_points:
+        return points
+    idx = minmax_indices([p[key] for p in points], max_points)
+    return [points[i] for i in idx]
@@ -0,0 +1,355 @@
+"""
+Multi-resolution equity history, shared by the MT5 and cTrader paths.
+
+Every sample (epoch seconds, equity, balance, floating P&L) lands in three
+ring buffers at once:
+
+    5s   — 5-second buckets, one day
+    1m   — 1-minute buckets, 30 days
+    15m  — 15-minute buckets, one year
+
+A bucket keeps the last sample that fell into it, so coarser tiers roll up
+by themselves as samples arrive — no background job. /history picks the
+finest tier that still covers the requested range.
+
+Each ring is four preallocated NumPy columns (int64 time, float64 equity,
+balance, pnl) — 32 bytes a point, no per-point objects. Queries return
+column slices (Series) that are encoded straight from the arrays: as the
+classic list of points, as parallel columns, or as raw records.
+
+Samples are also appended to one binary file per account (the same 32-byte
+records) in the project root, so history survives restarts and updates. On
+load the file is read in one go into the tiers and rewritten with only what
+they still hold; the same compaction runs whenever the file has grown past
+that by a day's worth of 5-second samples.
+
+Samples arrive on the asyncio loop (MT5 poller) and on the Twisted reactor
+thread (cTrader), so an EquityHistoryStore does no file work on the caller's
+thread: only the ring update is inline, and loading, appends and compaction
+run in order on the store's writer thread. Samples recorded before the file
+has been read are merged into what it holds; a read waits for the load.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Project root — survives updates
+_DIR = Path(__file__).resolve().parent.parent / "equity_history"
+
+Tier = namedtuple("Tier", "name step capacity")
+
+TIERS = (
+    Tier("5s",  5,   86_400 // 5),          # 1 day
+    Tier("1m",  60,  30 * 1_440),           # 30 days
+    Tier("15m", 900, 365 * 96),             # 1 year
+)
+
+# /history?range=… → seconds back from now (None = everything kept)
+RANGES = {
+    "1h":  3_600,
+    "6h":  6 * 3_600,
+    "1d":  86_400,
+    "7d":  7 * 86_400,
+    "30d": 30 * 86_400,
+    "90d": 90 * 86_400,
+    "1y":  365 * 86_400,
+    "all": None,
+}
+
+# On-disk record and format=binary payload: ts, equity, balance, pnl
+RECORD = np.dtype([("ts", "<i8"), ("equity", "<f8"), ("balance", "<f8"), ("pnl", "<f8")])
+
+# Chronological column slices of one tier
+Series = namedtuple("Series", "ts equity balance pnl")
+
+EMPTY = Series(np.empty(0, np.int64), np.empty(0), np.empty(0), np.empty(0))
+
+
+class _Ring:
+    def __init__(self, tier: Tier):
+        self.tier    = tier
+        self.ts      = np.zeros(tier.capacity, np.int64)
+        self.equity  = np.zeros(tier.capacity)
+        self.balance = np.zeros(tier.capacity)
+        self.pnl     = np.zeros(tier.capacity)
+        self.head    = 0          # next write position
+        self.size    = 0
+
+    def _last(self) -> int:
+        return (self.head - 1) % self.tier.capacity
+
+    def add(self, ts: int, equity: float, balance: float, pnl: float) -> None:
+        bucket = ts - ts % self.tier.step
+        if self.size:
+            last = self._last()
+            newest = self.ts[last]
+            if bucket < newest:            # clock stepped back — dropped
+                return
+            if bucket == newest:
+                self.equity[last], self.balance[last], self.pnl[last] = equity, balance, pnl
+                return
+        i = self.head
+        self.ts[i], self.equity[i], self.balance[i], self.pnl[i] = bucket, equity, balance, pnl
+        self.head = (i + 1) % self.tier.capacity
+        self.size = min(self.size + 1, self.tier.capacity)
+
+    def load(self, records: np.ndarray) -> None:
+        """Bulk-fill an empty ring from time-sorted records (last sample per bucket)."""
+        bucket = records["ts"] - records["ts"] % self.tier.step
+        last = np.append(bucket[1:] != bucket[:-1], True) if bucket.size else bucket.astype(bool)
+        bucket, records = bucket[last][-self.tier.capacity:], records[last][-self.tier.capacity:]
+        n = bucket.size
+        self.ts[:n], self.equity[:n] = bucket, records["equity"]
+        self.balance[:n], self.pnl[:n] = records["balance"], records["pnl"]
+        self.head, self.size = n % self.tier.capacity, n
+
+    def series(self, since: Optional[int] = None) -> Series:
+        if self.size < self.tier.capacity:
+            order = slice(0, self.size)
+            cols = [c[order] for c in (self.ts, self.equity, self.balance, self.pnl)]
+        else:
+            cols = [np.concatenate((c[self.head:], c[:self.head]))
+                    for c in (self.ts, self.equity, self.balance, self.pnl)]
+        start = 0 if since is None else int(np.searchsorted(cols[0], since, side="left"))
+        return Series(*(c[start:].copy() for c in cols))
+
+
+def pick_tier(range_seconds: Optional[int], resolution: Optional[str] = None) -> Tier:
+    """Requested tier, or the finest one whose retention covers the range."""
+    if resolution:
+        for tier in TIERS:
+            if tier.name == resolution:
+                return tier
+        raise ValueError(f"unknown resolution {resolution!r}")
+    if range_seconds is not None:
+        for tier in TIERS:
+            if tier.step * tier.capacity >= range_seconds:
+                return tier
+    return TIERS[-1]
+
+
+def to_records(series: Series) -> np.ndarray:
+    records = np.empty(series.ts.size, RECORD)
+    records["ts"], records["equity"] = series.ts, series.equity
+    records["balance"], records["pnl"] = series.balance, series.pnl
+    return records
+
+
+def encode_series(series: Series, fmt: str = "points") -> tuple[bytes, str]:
+    """
+    (body, media type) for /history without building a dict per point:
+      points  — [{"ts": ISO, "equity", "balance", "pnl"}, …] (the classic shape)
+      columns — {"ts": [epoch…], "equity": […], "balance": […], "pnl": […]}
+      binary  — little-endian RECORD structs, 32 bytes a point
+    """
+    if fmt == "binary":
+        return to_records(series).tobytes(), "application/octet-stream"
+    if fmt == "columns":
+        body = {name: col.tolist() for name, col in series._asdict().items()}
+        return json.dumps(body, separators=(",", ":")).encode(), "application/json"
+    if fmt == "points":
+        stamps = np.datetime_as_string(series.ts.astype("datetime64[s]")).tolist()
+        body = ",".join(
+            '{"ts":"%s","equity":%r,"balance":%r,"pnl":%r}' % row
+            for row in zip(stamps, series.equity.tolist(), series.balance.tolist(), series.pnl.tolist())
+        )
+        return f"[{body}]".encode(), "application/json"
+    raise ValueError(f"unknown format {fmt!r}")
+
+
+class _Writer:
+    """One thread running every file operation of a store, in submission order."""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="equity-history", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args) -> None:
+        self._queue.put((fn, args))
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            fn, args = job
+            try:
+                fn(*args)
+            except Exception as exc:
+                logger.warning(f"Equity history {fn.__name__} failed: {exc!r}")
+
+    def close(self) -> None:
+        """Finish everything submitted so far, then stop."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class EquityHistory:
+    """
+    Tiered samples of one account, mirrored to an append-only file.
+    With a `writer`, the file is read and written on its thread; without
+    one, inline.
+    """
+
+    def __init__(self, path: Optional[Path] = None, writer: Optional[_Writer] = None):
+        self._path = Path(path) if path is not None else None
+        self._rings = [_Ring(tier) for tier in TIERS]
+        self._lock = threading.Lock()
+        self._writer = writer
+        self._loaded = threading.Event()
+        self._file = None
+        self._appended = 0
+        if self._path is None:
+            self._loaded.set()
+        else:
+            self._io(self._load)
+
+    # ── persistence ─────────────────────────────────────────────────────────
+
+    def _io(self, fn, *args) -> None:
+        if self._writer is None:
+            fn(*args)
+        else:
+            self._writer.submit(fn, *args)
+
+    def _load(self) -> None:
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            records = np.empty(0, RECORD)
+            if self._path.exists():
+                data = self._path.read_bytes()
+                usable = len(data) - len(data) % RECORD.itemsize    # torn last write
+                records = np.frombuffer(data[:usable], RECORD)
+            with self._lock:
+                # Samples added while the file was read are newer than it;
+                # their appends are queued behind this load
+                records = np.concatenate((records, self._retained()))
+                records = records[np.argsort(records["ts"], kind="stable")]
+                for ring in self._rings:
+                    ring.load(records)
+                due = records.size > self._retained().size
+            if due:
+                self._compact()
+            self._file = open(self._path, "ab")
+        finally:
+            self._loaded.set()
+
+    def _retained(self) -> np.ndarray:
+        """Every sample still held by some tier, oldest first, one per timestamp."""
+        parts = [to_records(ring.series()) for ring in self._rings]   # finest first
+        merged = np.concatenate(parts)
+        _, first = np.unique(merged["ts"], return_index=True)         # finest wins
+        return merged[first]
+
+    def _compact(self) -> None:
+        # A sample whose append is still queued is written again after this;
+        # the duplicate timestamp is dropped at the next load
+        with self._lock:
+            records = self._retained()
+        tmp = self._path.with_suffix(".tmp")
+        tmp.write_bytes(records.tobytes())
+        if self._file is not None:
+            self._file.close()
+        os.replace(tmp, self._path)
+        self._file = open(self._path, "ab") if self._file is not None else None
+        self._appended = 0
+
+    # ── samples ─────────────────────────────────────────────────────────────
+
+    def add(self, equity: float, balance: float, pnl: float, ts: Optional[int] = None) -> None:
+        ts = int(ts if ts is not None else time.time())
+        with self._lock:
+            for ring in self._rings:
+                ring.add(ts, equity, balance, pnl)
+        if self._path is not None:
+            self._io(self._append, np.array([(ts, equity, balance, pnl)], RECORD).tobytes())
+
+    def _append(self, record: bytes) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(record)
+            self._file.flush()
+        except OSError as exc:
+            logger.warning(f"Equity history write failed ({self._path.name}): {exc}")
+            return
+        self._appended += 1
+        if self._appended >= TIERS[0].capacity:
+            self._compact()
+
+    def series(self, range_: str = "1h", resolution: Optional[str] = None,
+               now: Optional[int] = None) -> Series:
+        """Columns of one tier within the range."""
+        if range_ not in RANGES:
+            raise ValueError(f"unknown range {range_!r}")
+        seconds = RANGES[range_]
+        tier = pick_tier(seconds, resolution)
+        since = None if seconds is None else int(now if now is not None else time.time()) - seconds
+        self._loaded.wait()
+        with self._lock:
+            return self._rings[TIERS.index(tier)].series(since)
+
+    def close(self) -> None:
+        self._io(self._close_file)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class EquityHistoryStore:
+    """
+    One EquityHistory per (broker, account), created (and loaded) on first
+    use. All of their file work shares one writer thread.
+    """
+
+    def __init__(self, directory: Optional[Path] = _DIR):
+        self._dir = Path(directory) if directory is not None else None
+        self._histories: dict = {}
+        self._writer: Optional[_Writer] = None
+        self._lock = threading.Lock()
+
+    def get(self, broker: str, account) -> EquityHistory:
+        key = (broker, int(account))
+        with self._lock:
+            history = self._histories.get(key)
+            if history is None:
+                path = None
+                if self._dir is not None:
+                    path = self._dir / f"{broker}_{key[1]}.bin"
+                    self._writer = self._writer or _Writer()
+                history = self._histories[key] = EquityHistory(path, self._writer)
+        return history
+
+    def record(self, broker: str, account, equity: float, balance: float, pnl: float,
+               ts: Optional[int] = None) -> None:
+        self.get(broker, account).add(equity, balance, pnl, ts)
+
+    def series(self, broker: str, account, range_: str = "1h",
+               resolution: Optional[str] = None) -> Series:
+        return self.get(broker, account).series(range_, resolution)
+
+    def close(self) -> None:
+        with self._lock:
+            for history in self._histories.values():
+                history.close()
+            self._histories.clear()
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
+
+equity_store = EquityHistoryStore()
@@ -6,14 +6,15 @@ from pathlib import Path
 from typing import Optional
 
 import MetaTrader5 as mt5
-from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
 
 import broker_state
 
@@ -59,14 +60,18 @@ if CT_ERROR:
 
 from auth import clear_session, create_session, is_authenticated, require_api_key
 from config import settings
+from ct_live import ct_live
 from data_parser import build_full_equity_curve, get_overview_stats
-from mt5_client import connect_dynamic, disconnect
+from equity_history import encode_series, equity_store
+from mt5_client import MT5Overloaded, connect_dynamic, disconnect, mt5_worker
 from poller import get_equity_history, get_snapshot, polling_loop
 from routes.account import router as account_router
 from routes.calendar import router as calendar_router
+from routes.monitor import router as monitor_router
 from routes.positions import router as positions_router
 from routes.stats import router as stats_router
 from routes.update import router as update_router
+from symbol_registry import symbols
 from ws_manager import ws_manager
 
 logging.basicConfig(level=logging.INFO)
@@ -98,7 +103,7 @@ def _is_ct_active() -> bool:
 async def lifespan(app: FastAPI):
     # Try to pre-initialize MT5 terminal (no-op if not running / not installed)
     try:
-        mt5.initialize()
+        await mt5_worker.call(mt5.initialize)
         logger.info("MT5 terminal initialized — waiting for user login via browser")
     except Exception:
         logger.info("MT5 not available — cTrader-only mode")
@@ -106,7 +111,10 @@ async def lifespan(app: FastAPI):
     global _poller_task
     if _poller_task and not _poller_task.done():
         _poller_task.cancel()
-    disconnect()
+    ct_live.stop()
+    await mt5_worker.call(disconnect)
+    mt5_worker.shutdown()
+    equity_store.close()
     if CT_AVAILABLE and ct_client:
         ct_client.disconnect()
 
@@ -115,6 +123,12 @@ app = FastAPI(title="MT5 Monitor", lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+@app.exception_handler(MT5Overloaded)
+async def mt5_overloaded_handler(request: Request, exc: MT5Overloaded):
+    # The terminal queue for this priority class is full — shed load, let the client retry
+    return JSONResponse({"error": str(exc)}, status_code=503, headers={"Retry-After": "2"})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -157,7 +171,8 @@ class ConnectRequest(BaseModel):
 async def auth_connect(req: ConnectRequest):
     global _poller_task
 
-    if not connect_dynamic(req.login, req.password, req.server):
+    # Retries sleep between attempts — run on the MT5 thread, not the event loop
+    if not await mt5_worker.call(connect_dynamic, req.login, req.password, req.server):
         return {
             "ok": False,
             "error": (
@@ -166,6 +181,9 @@ async def auth_connect(req: ConnectRequest):
             ),
         }
 
+    # Another account/server may define symbols differently
+    symbols.refresh()
+
     # Switching from cTrader to MT5 must flip the active broker context,
     # otherwise overview/stat routes may keep reading cTrader state.
     broker_state.set_broker(broker_state.BROKER_MT5)
@@ -178,11 +196,12 @@ async def auth_connect(req: ConnectRequest):
     token = create_session()
 
     # Uruchom (lub zrestartuj) pętlę pollingu
+    ct_live.stop()
     if _poller_task and not _poller_task.done():
         _poller_task.cancel()
     _poller_task = asyncio.create_task(polling_loop(ws_manager))
 
-    info = mt5.account_info()
+    info = await mt5_worker.call(mt5.account_info)
     return {
         "ok":       True,
         "token":    token,
@@ -193,14 +212,16 @@ async def auth_connect(req: ConnectRequest):
 
 
 @app.post("/auth/logout")
-def auth_logout():
+async def auth_logout():
+    # async: the poller and cTrader push tasks are cancelled on the loop thread
     global _poller_task
     if _poller_task and not _poller_task.done():
         _poller_task.cancel()
         _poller_task = None
     clear_session()
+    ct_live.stop()
     if broker_state.is_mt5():
-        disconnect()
+        await mt5_worker.call(disconnect)
     else:
         if CT_AVAILABLE and ct_client:
             ct_client.disconnect()
@@ -422,6 +443,9 @@ async def ct_connect(req: CTConnectRequest):
         _poller_task.cancel()
         _poller_task = None
 
+    # cTrader state changes (reactor thread) → throttled pushes on /ws/live
+    ct_live.start(ws_manager)
+
     session_token = create_session()
     snap = ct_client.get_snapshot()
     acct = snap.get("account") or {}
@@ -460,6 +484,7 @@ async def ct_switch_account(req: CTSwitchAccountRequest):
     if not ok:
         return {"ok": False, "error": err}
 
+    ct_live.start(ws_manager)
     snap = ct_client.get_snapshot()
     acct = snap.get("account") or {}
     return {
@@ -474,6 +499,7 @@ async def ct_switch_account(req: CTSwitchAccountRequest):
 
 app.include_router(account_router)
 app.include_router(calendar_router)
+app.include_router(monitor_router)
 app.include_router(positions_router)
 app.include_router(stats_router)
 app.include_router(update_router)
@@ -489,10 +515,23 @@ def snapshot_endpoint(request: Request):
 
 @app.get("/history", dependencies=[Depends(require_api_key)])
 @limiter.limit("60/minute")
-def history_endpoint(request: Request):
-    if _is_ct_active():
-        return ct_client.get_equity_history()
-    return get_equity_history()
+def history_endpoint(
+    request: Request,
+    range_: str = Query("1h", alias="range"),
+    resolution: Optional[str] = Query(None),
+    format: str = Query("points"),
+):
+    # range: 1h 6h 1d 7d 30d 90d 1y all; resolution: 5s 1m 15m (default: finest tier covering the range)
+    # format: points (list of dicts), columns (parallel arrays), binary (32-byte records)
+    try:
+        if _is_ct_active():
+            series = ct_client.get_equity_history(range_, resolution)
+        else:
+            series = get_equity_history(range_, resolution)
+        body, media_type = encode_series(series, format)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return Response(body, media_type=media_type)
 
 
 @app.get("/overview", dependencies=[Depends(require_api_key)])
@@ -518,18 +557,18 @@ async def overview_endpoint(request: Request):
             cash_flows=cash_flows,
             equity_now=acct.get("equity"),
         )
-    return get_overview_stats()
+    return await run_in_threadpool(get_overview_stats)
 
 
 @app.get("/equity-curve", dependencies=[Depends(require_api_key)])
 @limiter.limit("6/minute")
-async def equity_curve_endpoint(request: Request):
+async def equity_curve_endpoint(request: Request, max_points: Optional[int] = Query(None, ge=10)):
+    # max_points: downsampled server-side (min/max buckets keep peaks and troughs),
+    # rounded down to one of downsample.POINT_BUDGETS (larger requests get the largest)
     if _is_ct_active():
-        from ct_poller import get_ct_all_deals_async
-        from ct_data_parser import compute_ct_equity_curve
-        deals = await get_ct_all_deals_async()
-        return compute_ct_equity_curve(deals)
-    return build_full_equity_curve()
+        from ct_poller import get_ct_equity_curve_async
+        return await get_ct_equity_curve_async(max_points)
+    return await run_in_threadpool(build_full_equity_curve, max_points)
 
 
 # ── WebSocket ─────────────────────────────────────────────────────────────────
@@ -544,6 +583,9 @@ async def websocket_endpoint(websocket: WebSocket):
     await ws_manager.connect(websocket)
     try:
         while True:
-            await websocket.receive_text()
+            # "ping" keeps the connection alive; "resync" = the client saw a
+            # gap in delta sequence numbers and needs the full state again
+            if await websocket.receive_text() == "resync":
+                await ws_manager.send_snapshot(websocket)
     except WebSocketDisconnect:
         await ws_manager.disconnect(websocket)
@@ -1,10 +1,157 @@
 import MetaTrader5 as mt5
+import asyncio
 import logging
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future
 
 logger = logging.getLogger(__name__)
 
 
+# Klasy priorytetu — niższa liczba wygrywa
+LIVE, INTERACTIVE, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = {LIVE: "live", INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Maks. liczba zleceń czekających w każdej klasie; ponad limit → MT5Overloaded
+QUEUE_LIMITS = {LIVE: 4, INTERACTIVE: 16, BACKGROUND: 32}
+
+LATENCY_WINDOW = 200      # ostatnie próbki do percentyli
+
+
+class MT5Overloaded(RuntimeError):
+    """Kolejka danej klasy jest pełna — zlecenie odrzucone zamiast czekać w nieskończoność."""
+
+
+class _ClassStats:
+    def __init__(self):
+        self.done = 0
+        self.rejected = 0
+        self.failed = 0
+        self.wait_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self.total_ms: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self, depth: int, limit: int) -> dict:
+        return {
+            "depth":        depth,
+            "limit":        limit,
+            "done":         self.done,
+            "rejected":     self.rejected,
+            "failed":       self.failed,
+            "wait_ms_p50":  _percentile(self.wait_ms, 50),
+            "wait_ms_p95":  _percentile(self.wait_ms, 95),
+            "total_ms_p50": _percentile(self.total_ms, 50),
+            "total_ms_p95": _percentile(self.total_ms, 95),
+            "total_ms_max": round(max(self.total_ms), 1) if self.total_ms else None,
+        }
+
+
+def _percentile(samples, pct: int):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, len(ordered) * pct // 100)], 1)
+
+
+class MT5Worker:
+    """
+    Jedyny wątek, który rozmawia z terminalem. Biblioteka MetaTrader5 nie jest
+    thread-safe, a jej wywołania (IPC, sleep przy reconnect) blokują — pętla
+    asyncio tylko zleca pracę i czeka na wynik, sama nigdy nie stoi.
+
+    Zlecenia czekają w kolejkach per klasa priorytetu (LIVE → INTERACTIVE →
+    BACKGROUND); wolny wątek zawsze bierze najstarsze zlecenie z najwyższej
+    niepustej klasy. Rozpoczętego zlecenia nie da się przerwać, dlatego przez
+    ten wątek idą tylko odczyty z terminala — obliczenia robią wywołujący.
+    """
+
+    def __init__(self, limits: dict | None = None):
+        self._limits = dict(limits or QUEUE_LIMITS)
+        self._queues = {cls: deque() for cls in PRIORITY_NAMES}
+        self._stats = {cls: _ClassStats() for cls in PRIORITY_NAMES}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_forever, name="mt5-worker", daemon=True)
+            self._thread.start()
+
+    def _run_forever(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not any(self._queues.values()):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                cls = next(c for c in sorted(self._queues) if self._queues[c])
+                future, fn, args, kwargs, queued_at = self._queues[cls].popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            try:
+                future.set_result(fn(*args, **kwargs))
+                failed = False
+            except BaseException as exc:
+                future.set_exception(exc)
+                failed = True
+            finished = time.perf_counter()
+
+            stats = self._stats[cls]
+            with self._cond:
+                stats.done += 1
+                stats.failed += failed
+                stats.wait_ms.append((started - queued_at) * 1000)
+                stats.total_ms.append((finished - queued_at) * 1000)
+
+    def submit(self, fn, *args, priority: int = INTERACTIVE, **kwargs) -> Future:
+        """Kolejkuje fn na wątku MT5; MT5Overloaded, gdy kolejka klasy jest pełna."""
+        future: Future = Future()
+        with self._cond:
+            if self._stopped:
+                raise MT5Overloaded("MT5 worker is stopped")
+            queue = self._queues[priority]
+            if len(queue) >= self._limits[priority]:
+                self._stats[priority].rejected += 1
+                raise MT5Overloaded(f"MT5 {PRIORITY_NAMES[priority]} queue is full ({len(queue)})")
+            queue.append((future, fn, args, kwargs, time.perf_counter()))
+            self._ensure_thread()
+            self._cond.notify()
+        return future
+
+    async def call(self, fn, *args, priority: int = INTERACTIVE, **kwargs):
+        """Wykonuje fn na wątku MT5 i czeka na wynik bez blokowania pętli."""
+        return await asyncio.wrap_future(self.submit(fn, *args, priority=priority, **kwargs))
+
+    def run(self, fn, *args, priority: int = INTERACTIVE, **kwargs):
+        """Wersja blokująca — dla kodu, który już działa poza pętlą (wątki FastAPI)."""
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, priority=priority, **kwargs).result()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                PRIORITY_NAMES[cls]: self._stats[cls].snapshot(len(self._queues[cls]), self._limits[cls])
+                for cls in PRIORITY_NAMES
+            }
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            pending = [job for queue in self._queues.values() for job in queue]
+            for queue in self._queues.values():
+                queue.clear()
+            self._cond.notify_all()
+        for future, *_ in pending:
+            future.cancel()
+
+
+mt5_worker = MT5Worker()
+
+
 def connect_dynamic(login: int, password: str, server: str,
                     retries: int = 3, backoff: float = 1.5) -> bool:
     """Łączy z MT5 przy użyciu danych podanych przez użytkownika (np. hasło investor)."""
@@ -0,0 +1,46 @@
+"""
+Adaptive poll cadence shared by the MT5 and cTrader pollers.
+
+Polling fast only pays off while someone is looking at something that moves:
+open positions, a connected dashboard and an open market. In that state the
+interval drops straight to its minimum; otherwise it grows geometrically
+towards the maximum, so a flat account, a weekend or an empty room settle
+into a slow heartbeat within a few ticks instead of hammering the terminal.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+
+def market_open(now: Optional[datetime] = None) -> bool:
+    """
+    FX week approximation in UTC: Sunday 22:00 → Friday 22:00.
+    Brokers shift this by an hour with DST; a late or early hour only
+    changes how fast the cadence decays, never what a poll returns.
+    """
+    now = now or datetime.utcnow()
+    weekday = now.weekday()            # Monday = 0 … Sunday = 6
+    if weekday == 5:
+        return False
+    if weekday == 4:
+        return now.hour < 22
+    if weekday == 6:
+        return now.hour >= 22
+    return True
+
+
+class AdaptiveInterval:
+    def __init__(self, minimum: float, maximum: float,
+                 start: Optional[float] = None, growth: float = 2.0):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.growth  = growth
+        self.current = min(self.maximum, max(self.minimum, start if start is not None else minimum))
+
+    def update(self, open_positions: int, watchers: int, now: Optional[datetime] = None) -> float:
+        """Seconds until the next poll, given what the last one saw."""
+        if open_positions and watchers and market_open(now):
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * self.growth)
+        return self.current
@@ -1,13 +1,16 @@
 import asyncio
 import logging
-from collections import deque
+import time
 from datetime import datetime
+from typing import Optional
 
 import MetaTrader5 as mt5
 
 from config import settings
-from data_parser import parse_account, parse_positions
-from mt5_client import ensure_connected
+from data_parser import parse_account, parse_positions, sync_history
+from equity_history import EMPTY, Series, equity_store
+from mt5_client import BACKGROUND, LIVE, ensure_connected, mt5_worker
+from poll_cadence import AdaptiveInterval
 
 logger = logging.getLogger(__name__)
 
@@ -15,27 +18,107 @@ logger = logging.getLogger(__name__)
 snapshot: dict = {}
 snapshot_lock = asyncio.Lock()
 
-# Seria czasowa equity/balance — max 500 punktów, próbkowanie co ~5 s
-EQUITY_MAX   = 500
+# Seria czasowa equity/balance — próbkowanie co ~5 s do wielopoziomowej
+# historii (5 s / 1 min / 15 min) zapisywanej na dysk, patrz equity_history.py.
+# Bez otwartych pozycji equity = saldo, więc wystarcza próbka co tick
+# (nawet przy POLL_INTERVAL_MAX)
 EQUITY_EVERY = 5          # sekund między próbkami
-equity_history: deque = deque(maxlen=EQUITY_MAX)
-_equity_counter = 0       # licznik ticków do próbkowania
+_last_equity_sample = 0.0  # time.monotonic() ostatniej próbki
+
+# Interwał pollingu: POLL_INTERVAL_MIN przy otwartych pozycjach, podłączonym
+# dashboardzie i otwartym rynku; w przeciwnym razie rośnie do POLL_INTERVAL_MAX
+cadence = AdaptiveInterval(settings.POLL_INTERVAL_MIN, settings.POLL_INTERVAL_MAX, settings.POLL_INTERVAL)
+
+# Saldo + otwarte pozycje z poprzedniego ticku — zamknięcie (nowy deal
+# wyjścia) zmienia jedno z nich, tylko wtedy dociągamy historię do rollupu
+_history_marker = None
+
+
+# Surowe krotki z poprzedniego ticku — bez zmian = bez parsowania,
+# podmiany snapshotu, kodowania JSON i broadcastu
+_last_raw = None
+poll_stats = {"ticks_emitted": 0, "ticks_skipped": 0, "last_tick": None, "interval": cadence.current}
+
+
+def _raw_key(info, positions) -> tuple:
+    # AccountInfo i TradePosition to namedtuple z prostymi polami; porównanie
+    # krotek odbywa się w C i nie wymaga parsowania do słowników
+    return (info, positions)
+
+
+def _history_key(info, positions) -> tuple:
+    return (
+        info.login,
+        round(info.balance, 2),
+        tuple(sorted((p.ticket, p.volume) for p in positions or ())),
+    )
+
+
+def _read_terminal():
+    # Wykonywane na wątku MT5: reconnect (ze sleepem) i oba odczyty w jednym zleceniu
+    if not ensure_connected():
+        return None
+    return mt5.account_info(), mt5.positions_get()
+
+
+def _next_sleep(open_positions: int) -> float:
+    # Przy otwartych pozycjach equity się rusza i próbka ma przyjść co
+    # EQUITY_EVERY sekund — tick nie może na nią czekać dłużej, nawet gdy
+    # nikt nie patrzy. Płaskie konto śpi pełny interwał (do POLL_INTERVAL_MAX).
+    if not open_positions:
+        return cadence.current
+    until_sample = _last_equity_sample + EQUITY_EVERY - time.monotonic()
+    return max(settings.POLL_INTERVAL_MIN, min(cadence.current, until_sample))
+
+
+def _background_sync(login: int) -> None:
+    try:
+        sync_history(login, max_age=0, priority=BACKGROUND)
+    except Exception as e:
+        # Przy przeciążeniu pominięte — następne zapytanie REST i tak zsynchronizuje rejestr
+        logger.info(f"Background history sync skipped: {e}")
 
 
 async def polling_loop(ws_manager):
     """
-    Jeden task robi polling MT5 co POLL_INTERVAL sekund.
+    Jeden task robi polling MT5 w rytmie `cadence` (adaptacyjnym).
     Wszystkie REST i WS czytają z tego snapshotu.
     """
-    global _equity_counter
+    global _last_equity_sample, _history_marker, _last_raw
+    open_positions = 0
     while True:
         try:
-            if not ensure_connected():
+            terminal = await mt5_worker.call(_read_terminal, priority=LIVE)
+            if terminal is None:
                 await asyncio.sleep(5)
                 continue
 
-            info      = mt5.account_info()
-            positions = mt5.positions_get()
+            info, positions = terminal
+            open_positions = len(positions or ())
+            poll_stats["last_tick"] = datetime.utcnow().isoformat()
+            poll_stats["interval"]  = cadence.update(open_positions, ws_manager.client_count())
+
+            # Próbkuj equity co EQUITY_EVERY sekund (także gdy nic się nie zmieniło)
+            now = time.monotonic()
+            if now - _last_equity_sample >= EQUITY_EVERY and info is not None:
+                equity_store.record(
+                    "mt5", info.login,
+                    round(info.equity, 2), round(info.balance, 2), round(info.profit, 2),
+                )
+                _last_equity_sample = now
+
+            raw = _raw_key(info, positions)
+            if raw == _last_raw and snapshot:
+                poll_stats["ticks_skipped"] += 1
+                await asyncio.sleep(_next_sleep(open_positions))
+                continue
+
+            if info is not None:
+                marker = _history_key(info, positions)
+                if marker != _history_marker:
+                    # W tle — odczyt historii nie może opóźnić ticku na żywo
+                    asyncio.get_running_loop().run_in_executor(None, _background_sync, info.login)
+                    _history_marker = marker
 
             new_snapshot = {
                 "account":   parse_account(info),
@@ -47,28 +130,26 @@ async def polling_loop(ws_manager):
                 snapshot.clear()
                 snapshot.update(new_snapshot)
 
-            # Próbkuj equity co EQUITY_EVERY sekund
-            _equity_counter += settings.POLL_INTERVAL
-            if _equity_counter >= EQUITY_EVERY and info is not None:
-                equity_history.append({
-                    "ts":      datetime.utcnow().isoformat(),
-                    "equity":  round(info.equity, 2),
-                    "balance": round(info.balance, 2),
-                    "pnl":     round(info.profit, 2),
-                })
-                _equity_counter = 0
-
             await ws_manager.broadcast(snapshot)
+            _last_raw = raw
+            poll_stats["ticks_emitted"] += 1
 
         except Exception as e:
             logger.error(f"Polling error: {e}", exc_info=True)
 
-        await asyncio.sleep(settings.POLL_INTERVAL)
+        await asyncio.sleep(_next_sleep(open_positions))
 
 
 def get_snapshot() -> dict:
     return snapshot
 
 
-def get_equity_history() -> list:
-    return list(equity_history)
+def get_equity_history(range_: str = "1h", resolution: Optional[str] = None) -> Series:
+    account = snapshot.get("account")
+    if not account:
+        return EMPTY
+    return equity_store.series("mt5", account["login"], range_, resolution)
+
+
+def get_poll_stats() -> dict:
+    return dict(poll_stats)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
 from auth import require_api_key
-from data_calendar import get_calendar_data
+from data_calendar import get_calendar_data, get_calendar_year
 from datetime import datetime
 
 router = APIRouter()
@@ -19,20 +20,22 @@ async def calendar_endpoint(request: Request, year: int = None, month: int = Non
     m = month if month is not None else now.month
 
     if broker_state.is_ct() or _cc.is_connected():
-        from ct_poller import get_ct_deals_async
-        from ct_data_parser import compute_ct_calendar
-        # Fetch only the relevant month from cTrader
-        from datetime import timedelta
-        month_start = datetime(y, m, 1)
-        month_end   = datetime(y + 1, 1, 1) if m == 12 else datetime(y, m + 1, 1)
-        from_ms = int(month_start.timestamp() * 1000)
-        to_ms   = int(month_end.timestamp()   * 1000)
-        import asyncio
-        loop  = asyncio.get_event_loop()
-        deals = await loop.run_in_executor(
-            None, _cc.fetch_deals, from_ms, to_ms
-        )
-        sym_map = dict(_cc._symbol_map)
-        return compute_ct_calendar(deals, y, m, sym_map)
-
-    return get_calendar_data(y, m)
+        from ct_poller import get_ct_calendar_async
+        # Served from the local deal store; closed months come from the cache
+        return await get_ct_calendar_async(y, m)
+
+    return await run_in_threadpool(get_calendar_data, y, m)
+
+
+@router.get("/calendar/year", dependencies=[Depends(require_api_key)])
+@limiter.limit("30/minute")
+async def calendar_year_endpoint(request: Request, year: int = None):
+    import broker_state
+    import ct_client as _cc
+    y = year if year is not None else datetime.utcnow().year
+
+    if broker_state.is_ct() or _cc.is_connected():
+        from ct_poller import get_ct_calendar_year_async
+        return await get_ct_calendar_year_async(y)
+
+    return await run_in_threadpool(get_calendar_year, y)
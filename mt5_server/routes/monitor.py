@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from auth import require_api_key
+from ct_backfill import progress as ct_backfill_progress
+from ct_live import ct_live
+from ct_poller import history_flights as ct_history_flights
+from data_parser import history_flights as mt5_history_flights
+from mt5_client import mt5_worker
+from poller import get_poll_stats
+from ws_manager import ws_manager
+
+router = APIRouter(tags=["monitor"])
+limiter = Limiter(key_func=get_remote_address)
+
+
+@router.get("/monitor", dependencies=[Depends(require_api_key)])
+@limiter.limit("60/minute")
+def monitor(request: Request):
+    """Liczniki pracy w tle: ticki pollera, klienci WebSocket, kolejki terminala MT5, synchronizacje historii, push i backfill cTrader."""
+    return {
+        "poller":  get_poll_stats(),
+        "ws":      ws_manager.stats(),
+        "mt5":     {**mt5_worker.stats(), "history_flights": mt5_history_flights.stats()},
+        "ctrader": {
+            **ct_live.stats(),
+            "backfill":        ct_backfill_progress(),
+            "history_flights": ct_history_flights.stats(),
+        },
+    }
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
 
 import broker_state
 import ct_client
@@ -16,13 +17,9 @@ limiter = Limiter(key_func=get_remote_address)
 async def statistics(request: Request, days: int = 30):
     use_ct = broker_state.is_ct() or ct_client.is_connected()
     if use_ct:
-        from ct_poller import get_ct_deals_async
-        from ct_data_parser import parse_ct_statistics
-        import ct_client as _cc
-        deals = await get_ct_deals_async(days)
-        sym_map = dict(_cc._symbol_map)
-        return parse_ct_statistics(deals, days, sym_map)
-    return parse_statistics(days)
+        from ct_poller import get_ct_statistics_async
+        return await get_ct_statistics_async(days)
+    return await run_in_threadpool(parse_statistics, days)
 
 
 @router.get("/statistics/full", dependencies=[Depends(require_api_key)])
@@ -46,4 +43,4 @@ async def statistics_full(request: Request, days: int = 30):
             days          = days,
             symbol_map    = sym_map,
         )
-    return compute_full_stats(days)
+    return await run_in_threadpool(compute_full_stats, days)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Benchmark the columnar statistics pipeline on synthetic MT5 deal history.
+
+Usage:
+  python bench_deal_stats.py [--deals 150000] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from deal_columns import aggregate_trades, balance_deltas, deals_to_array, trade_stats  # noqa: E402
+
+_Deal = namedtuple(
+    "_Deal",
+    "ticket position_id time type entry symbol volume price profit swap commission",
+)
+_SYMBOLS = ("EURUSD", "GBPUSD", "USDJPY", "XAUUSD", "US30")
+
+
+def _synthetic_deals(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    deals = [_Deal(1, 0, 1_500_000_000, 2, 0, "", 0.0, 0.0, 100_000.0, 0.0, 0.0)]
+    ts = 1_500_000_000
+    ticket = 2
+    position = 1
+    while len(deals) < count:
+        ts += rng.randint(5, 900)
+        side = rng.randint(0, 1)
+        symbol = rng.choice(_SYMBOLS)
+        price = 1.0 + rng.random()
+        deals.append(_Deal(ticket, position, ts, side, 0, symbol, 0.1, price, 0.0, 0.0, -0.35))
+        ticket += 1
+        for _ in range(rng.choice((1, 1, 1, 2))):
+            close_ts = ts + rng.randint(1, 7200)
+            deals.append(_Deal(
+                ticket, position, close_ts, 1 - side, 1, symbol, 0.05,
+                price + rng.uniform(-0.01, 0.01), round(rng.uniform(-80, 90), 2),
+                rng.choice((0.0, -0.12)), -0.35,
+            ))
+            ticket += 1
+        position += 1
+    return deals
+
+
+def _best_of(repeat: int, fn):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--deals", type=int, default=150_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw = _synthetic_deals(args.deals)
+    pip_size_of = lambda symbol: 0.01 if "JPY" in symbol else 0.0001  # noqa: E731
+
+    t_build, deals = _best_of(args.repeat, lambda: deals_to_array(raw))
+    t_trades, trades = _best_of(args.repeat, lambda: aggregate_trades(deals, pip_size_of))
+    balance_start = float(balance_deltas(deals[:1]).sum())
+    balance_end = float(balance_deltas(deals).sum())
+    t_stats, _ = _best_of(args.repeat, lambda: trade_stats(trades, balance_start, balance_end))
+
+    print(f"deals={deals.size} trades={trades.size} (best of {args.repeat})")
+    print(f"  deals_to_array   {t_build * 1000:8.1f} ms")
+    print(f"  aggregate_trades {t_trades * 1000:8.1f} ms")
+    print(f"  trade_stats      {t_stats * 1000:8.1f} ms")
+    print(f"  total            {(t_build + t_trades + t_stats) * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
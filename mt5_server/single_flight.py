@@ -0,0 +1,127 @@
+"""
+Single-flight coalescing of broker history queries.
+
+A dashboard load fires /overview, /equity-curve, /statistics/full and
+/calendar almost together, and each of them first brings the account's
+history up to date. A flight is one such query, registered under a key
+(the account). A caller that finds a flight running for its key waits for
+it and shares its result instead of asking the broker again. A sync always
+brings the whole history up to date, so it serves every caller, whatever
+period each then reads from the store.
+
+A forced refresh (`fresh=True` — a caller that knows the broker has news,
+e.g. a deal event) must not be served by a flight that started before the
+news: it only joins a flight that has not begun querying yet, and otherwise
+starts one that runs once the flights already running for the key are done.
+
+SingleFlight is for blocking callers (MT5 — threadpool threads),
+AsyncSingleFlight for coroutines on the event loop (cTrader).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Flights:
+    def __init__(self):
+        self._flights: dict = {}     # key → [future, …] still running, oldest first
+        self._queued: set = set()    # futures of flights still waiting for their predecessors
+        self.started = 0
+        self.shared = 0
+
+    def _find(self, key: Hashable, fresh: bool = False):
+        for future in self._flights.get(key, ()):
+            if not fresh or future in self._queued:
+                return future
+        return None
+
+    def _running(self, key: Hashable) -> list:
+        return list(self._flights.get(key, ()))
+
+    def _add(self, key: Hashable, future) -> None:
+        self._flights.setdefault(key, []).append(future)
+
+    def _remove(self, key: Hashable, future) -> None:
+        running = self._flights.get(key)
+        if running is not None and future in running:
+            running.remove(future)
+            if not running:
+                del self._flights[key]
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "shared":  self.shared,
+            "running": sum(len(running) for running in self._flights.values()),
+        }
+
+
+class SingleFlight(_Flights):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], fresh: bool = False) -> Any:
+        """Run `fn()` as the flight for `key`, or join the one already running."""
+        with self._lock:
+            future = self._find(key, fresh)
+            if future is not None:
+                self.shared += 1
+                leader = False
+            else:
+                before = self._running(key) if fresh else []
+                future = Future()
+                self._add(key, future)
+                self.started += 1
+                leader = True
+                if before:
+                    self._queued.add(future)
+        if not leader:
+            return future.result()
+
+        if before:
+            wait(before)
+            with self._lock:
+                self._queued.discard(future)
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._remove(key, future)
+        return future.result()
+
+
+class AsyncSingleFlight(_Flights):
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], fresh: bool = False) -> Any:
+        """
+        Await `fn()` as the flight for `key`, or join the one already
+        running. The flight runs as its own task: a caller that is
+        cancelled stops waiting but does not cancel the others' query.
+        """
+        task = self._find(key, fresh)
+        if task is not None:
+            self.shared += 1
+        else:
+            before = self._running(key) if fresh else []
+            task = asyncio.ensure_future(self._after(before, fn) if before else fn())
+            if before:
+                self._queued.add(task)
+            self._add(key, task)
+            self.started += 1
+            task.add_done_callback(lambda t: self._finished(key, t))
+        return await asyncio.shield(task)
+
+    async def _after(self, before: list, fn: Callable[[], Awaitable[Any]]) -> Any:
+        await asyncio.wait(before)
+        self._queued.discard(asyncio.current_task())
+        return await fn()
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        self._remove(key, task)
+        self._queued.discard(task)
+        if not task.cancelled():
+            task.exception()         # retrieved — every waiter may have gone
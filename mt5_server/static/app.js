@@ -482,7 +482,7 @@ async function showDashboard(initialData = null) {
   calMonth = now.getMonth() + 1;
   await Promise.all([loadOverview(), loadEquityCurve(), loadFullStats()]);
   overviewInterval = setInterval(loadOverview, 5000);
-  loadCalendar();
+  loadCalendar(true);
   initMenuDrawer();
 }
 
@@ -708,7 +708,7 @@ async function handleCtSwitchAccount() {
       status.className   = 'ct-switch-status ok';
       // Reload overview data for the new account
       await Promise.all([loadOverview(), loadEquityCurve(), loadFullStats()]);
-      loadCalendar();
+      loadCalendar(true);
     } else {
       status.textContent = data.error || 'Błąd przełączania konta';
       status.className   = 'ct-switch-status error';
@@ -807,7 +807,10 @@ async function loadOverviewFallback() {
 async function loadEquityCurve() {
   try {
     setText('chart-pts', 'Ładowanie…');
-    const res    = await fetch('/equity-curve', { headers: { 'X-API-Key': apiKey } });
+    // Serwer zmniejsza krzywą do ~2 punktów na piksel wykresu (szczyty i dołki zostają)
+    const canvas    = document.getElementById('equity-chart');
+    const maxPoints = Math.min(5000, Math.max(200, Math.round((canvas?.clientWidth || 1000) * 2)));
+    const res    = await fetch(`/equity-curve?max_points=${maxPoints}`, { headers: { 'X-API-Key': apiKey } });
     if (res.status === 401) {
       handleAuthExpired();
       return;
@@ -886,7 +889,7 @@ function connectWs() {
   const proto = location.protocol === 'https:' ? 'wss' : 'ws';
   ws = new WebSocket(`${proto}://${location.host}/ws/live?key=${encodeURIComponent(apiKey)}`);
   ws.onopen    = () => { setWsDot(true);  clearTimeout(wsReconnectTimer); };
-  ws.onmessage = ({ data }) => { try { renderSnapshot(JSON.parse(data)); } catch {} };
+  ws.onmessage = ({ data }) => { try { handleLiveMessage(JSON.parse(data)); } catch {} };
   ws.onclose   = () => {
     setWsDot(false);
     if (!apiKey) return;
@@ -902,6 +905,7 @@ function connectWs() {
 }
 function disconnectWs() {
   clearTimeout(wsReconnectTimer);
+  liveSeq = null;
   if (ws) { ws.onclose = null; ws.close(); ws = null; }
   setWsDot(false);
 }
@@ -912,6 +916,36 @@ function setWsDot(ok) {
 }
 setInterval(() => { if (ws && ws.readyState === WebSocket.OPEN) ws.send('ping'); }, 25000);
 
+/* ── Live state (snapshot + delty z numerami sekwencji) ──────────────────── */
+let liveSeq       = null;        // null = czekamy na pełny snapshot
+let liveAccount   = null;
+let livePositions = new Map();   // ticket → pozycja, w kolejności z serwera
+
+function handleLiveMessage(msg) {
+  if (msg.type === 'snapshot') {
+    liveSeq       = msg.seq;
+    liveAccount   = msg.account || null;
+    livePositions = new Map((msg.positions || []).map(p => [p.ticket, p]));
+  } else if (msg.type === 'delta') {
+    if (liveSeq === null) return;          // resync w toku
+    if (msg.seq <= liveSeq) return;        // już zawarta w nowszym snapshocie
+    if (msg.seq !== liveSeq + 1) {         // luka — poproś o pełny stan
+      liveSeq = null;
+      if (ws && ws.readyState === WebSocket.OPEN) ws.send('resync');
+      return;
+    }
+    liveSeq = msg.seq;
+    if (msg.account) liveAccount = { ...(liveAccount || {}), ...msg.account };
+    const pos = msg.positions || {};
+    (pos.removed || []).forEach(t => livePositions.delete(t));
+    (pos.changed || []).forEach(p => livePositions.set(p.ticket, { ...livePositions.get(p.ticket), ...p }));
+    (pos.added   || []).forEach(p => livePositions.set(p.ticket, p));
+  } else {
+    return;
+  }
+  renderSnapshot({ account: liveAccount, positions: [...livePositions.values()], timestamp: msg.timestamp });
+}
+
 /* ── Snapshot renderer ───────────────────────────────────────────────────── */
 function renderSnapshot({ account, positions, timestamp }) {
   if (timestamp) {
@@ -1095,19 +1129,34 @@ const MONTHS_PL = [
 ];
 const DOW = ['PON','WTO','ŚRO','CZW','PIĄ','SOB','NED'];
 
-async function loadCalendar() {
+// Cały rok pobierany jednym zapytaniem; przełączanie miesięcy w tym samym roku
+// korzysta z pamięci podręcznej (odświeżanej co minutę)
+const CAL_YEAR_TTL_MS = 60 * 1000;
+let calYearCache = null;   // { year, fetchedAt, months }
+
+async function loadCalendar(force = false) {
   const label = document.getElementById('cal-month-label');
   if (label) label.textContent = `${MONTHS_PL[calMonth - 1]} ${calYear}`;
 
+  const fresh = calYearCache && calYearCache.year === calYear
+    && Date.now() - calYearCache.fetchedAt < CAL_YEAR_TTL_MS;
+  if (fresh && !force) {
+    renderCalendar(calYear, calMonth, calYearCache.months[calMonth] || {});
+    return;
+  }
+
+  const year = calYear;
   try {
-    const res  = await fetch(`/calendar?year=${calYear}&month=${calMonth}`, { headers: { 'X-API-Key': apiKey } });
+    const res  = await fetch(`/calendar/year?year=${year}`, { headers: { 'X-API-Key': apiKey } });
     if (res.status === 401) {
       handleAuthExpired();
       return;
     }
     const data = await res.json();
     if (!res.ok) { renderCalendarError(); return; }
-    renderCalendar(calYear, calMonth, data);
+    calYearCache = { year, fetchedAt: Date.now(), months: data.months || {} };
+    if (year !== calYear) return;   // użytkownik zdążył przejść do innego roku
+    renderCalendar(calYear, calMonth, calYearCache.months[calMonth] || {});
   } catch (e) {
     renderCalendarError();
   }
@@ -1238,7 +1287,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const now = new Date();
     calYear  = now.getFullYear();
     calMonth = now.getMonth() + 1;
-    loadCalendar();
+    loadCalendar(true);
   });
 });
 
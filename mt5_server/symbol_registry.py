@@ -0,0 +1,72 @@
+"""
+Memoized MT5 symbol metadata (point, digits, contract size, profit currency).
+
+mt5.symbol_info() is a terminal IPC round trip; pip and P&L math over a long
+history needs it once per symbol, not once per trade. Entries stay cached
+(including "unknown symbol" misses) until refresh() is called — e.g. after
+logging in to a different account/server.
+"""
+
+import logging
+import threading
+from collections import namedtuple
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SymbolMeta = namedtuple("SymbolMeta", "name point digits contract_size profit_currency")
+
+
+def _terminal_symbol_info(name: str):
+    import MetaTrader5 as mt5
+    from mt5_client import mt5_worker
+    # Only the terminal read goes to the MT5 thread; stats that need the
+    # metadata run on FastAPI threadpool threads and wait for it here
+    return mt5_worker.run(mt5.symbol_info, name)
+
+
+class SymbolRegistry:
+    def __init__(self, lookup: Callable = _terminal_symbol_info):
+        self._lookup = lookup
+        self._cache: dict[str, Optional[SymbolMeta]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[SymbolMeta]:
+        """Metadata for `name`; None when the terminal does not know the symbol."""
+        with self._lock:
+            if name in self._cache:
+                return self._cache[name]
+
+        info = self._lookup(name) if name else None
+        meta = None
+        if info is not None:
+            meta = SymbolMeta(
+                name=name,
+                point=float(getattr(info, "point", 0.0) or 0.0),
+                digits=int(getattr(info, "digits", 0) or 0),
+                contract_size=float(getattr(info, "trade_contract_size", 0.0) or 0.0),
+                profit_currency=getattr(info, "currency_profit", "") or "",
+            )
+        with self._lock:
+            self._cache[name] = meta
+        return meta
+
+    def pip_size(self, name: str) -> float:
+        """Pip = 10 × point; 0.0 when unknown (callers apply their own default)."""
+        meta = self.get(name)
+        return meta.point * 10.0 if meta and meta.point > 0 else 0.0
+
+    def refresh(self, name: Optional[str] = None) -> None:
+        """Drop one symbol (or everything) so the next lookup asks the terminal again."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+symbols = SymbolRegistry()
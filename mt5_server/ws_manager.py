@@ -1,43 +1,240 @@
 import asyncio
 import json
 import logging
+from collections import deque
 from fastapi import WebSocket
 
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # optional speed-up — stdlib json is used without it
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def encode(message: dict) -> str:
+    """Encode a WS message once for all clients (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(message, default=str).decode()
+    return json.dumps(message, default=str, separators=(",", ":"), ensure_ascii=False)
+
+
+# /ws/live protocol
+# ────────────────
+# On connect (and on a "resync" request) a client gets the whole state:
+#   {"type": "snapshot", "seq": n, "account": {...}, "positions": [...], "timestamp": ...}
+# Every later broadcast carries only what changed since the previous one:
+#   {"type": "delta", "seq": n + 1, "timestamp": ...,
+#    "account":   {changed fields},                        # omitted if unchanged
+#    "positions": {"added":   [full position, ...],        # omitted if unchanged
+#                  "changed": [{"ticket": t, changed fields}, ...],
+#                  "removed": [ticket, ...]}}
+# seq grows by one per message broadcast; a client that sees a gap sends
+# "resync" and gets a fresh snapshot. Ticks where nothing changed send nothing.
+# Frames are queued per client (QUEUE_MAX); a client that falls behind has its
+# backlog replaced by one snapshot, after which deltas with seq <= the
+# snapshot's are stale and skipped.
+
+
+def _diff_fields(old: dict, new: dict) -> dict:
+    return {k: v for k, v in new.items() if old.get(k) != v}
+
+
+def _diff_positions(old: dict, new: dict) -> dict:
+    """old/new: ticket → position dict."""
+    added, changed = [], []
+    for ticket, pos in new.items():
+        prev = old.get(ticket)
+        if prev is None:
+            added.append(pos)
+        elif prev != pos:
+            changed.append({"ticket": ticket, **_diff_fields(prev, pos)})
+    removed = [ticket for ticket in old if ticket not in new]
+
+    diff: dict = {}
+    if added:
+        diff["added"] = added
+    if changed:
+        diff["changed"] = changed
+    if removed:
+        diff["removed"] = removed
+    return diff
+
+
+# Frames waiting per client before older ones are coalesced
+QUEUE_MAX = 8
+
+# Queue entry meaning "send the current full state" — replaces dropped deltas
+_SNAPSHOT = None
+
+
+class _Client:
+    """One /ws/live connection: a bounded outbound queue drained by its own task."""
+
+    def __init__(self, ws: WebSocket, client_id: int):
+        self.ws = ws
+        self.id = client_id
+        self.queue: deque = deque()
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.sent = 0
+        self.dropped = 0
+
+    def push(self, frame) -> None:
+        if len(self.queue) >= QUEUE_MAX:
+            # Latest wins: unsent frames collapse into one fresh snapshot,
+            # which carries everything the dropped deltas would have
+            self.dropped += sum(1 for f in self.queue if f is not _SNAPSHOT)
+            self.queue.clear()
+            frame = _SNAPSHOT
+        self.queue.append(frame)
+        self.ready.set()
+
+
 class WebSocketManager:
-    def __init__(self):
-        self._connections: set[WebSocket] = set()
+    def __init__(self, send_timeout: float | None = None):
+        self._clients: dict[WebSocket, _Client] = {}
         self._lock = asyncio.Lock()
+        self._send_timeout = send_timeout if send_timeout is not None else settings.WS_SEND_TIMEOUT
+        self._next_id = 0
+        self.evicted = 0
+        # Last broadcast state — the base the next delta is computed against.
+        # Each tick parses fresh dicts, so keeping references is safe.
+        self._seq = 0
+        self._account = None
+        self._positions: dict = {}      # ticket → position dict, in broker order
+        self._timestamp = None
+        self._snapshot_cache: tuple | None = None   # (seq, encoded snapshot)
 
     async def connect(self, ws: WebSocket):
         await ws.accept()
         async with self._lock:
-            self._connections.add(ws)
-        logger.info(f"WS connected. Total: {len(self._connections)}")
+            self._next_id += 1
+            client = _Client(ws, self._next_id)
+            self._clients[ws] = client
+            client.task = asyncio.create_task(self._writer(client))
+        logger.info(f"WS connected. Total: {len(self._clients)}")
+        if self._account is not None or self._positions:
+            client.push(self._snapshot_text())
 
     async def disconnect(self, ws: WebSocket):
         async with self._lock:
-            self._connections.discard(ws)
-        logger.info(f"WS disconnected. Total: {len(self._connections)}")
+            client = self._clients.pop(ws, None)
+        if client is not None and client.task is not None:
+            client.task.cancel()
+        logger.info(f"WS disconnected. Total: {len(self._clients)}")
+
+    def _snapshot_message(self) -> dict:
+        return {
+            "type":      "snapshot",
+            "seq":       self._seq,
+            "account":   self._account,
+            "positions": list(self._positions.values()),
+            "timestamp": self._timestamp,
+        }
+
+    def _snapshot_text(self) -> str:
+        # Encoded once per seq, however many clients connect or resync
+        if self._snapshot_cache is None or self._snapshot_cache[0] != self._seq:
+            self._snapshot_cache = (self._seq, encode(self._snapshot_message()))
+        return self._snapshot_cache[1]
+
+    async def send_snapshot(self, ws: WebSocket):
+        """Queue the full state for one client — on connect and when it asks to resync."""
+        client = self._clients.get(ws)
+        if client is not None:
+            client.push(self._snapshot_text())
+
+    async def _writer(self, client: _Client) -> None:
+        """Drains one client's queue; a send that misses the deadline evicts the client."""
+        try:
+            while True:
+                await client.ready.wait()
+                client.ready.clear()
+                while client.queue:
+                    frame = client.queue.popleft()
+                    text = self._snapshot_text() if frame is _SNAPSHOT else frame
+                    await asyncio.wait_for(client.ws.send_text(text), self._send_timeout)
+                    client.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await self._evict(client, exc)
+
+    async def _evict(self, client: _Client, reason: Exception) -> None:
+        async with self._lock:
+            if self._clients.get(client.ws) is not client:
+                return
+            del self._clients[client.ws]
+            self.evicted += 1
+        logger.info(f"WS client evicted ({type(reason).__name__}). Total: {len(self._clients)}")
+        try:
+            await asyncio.wait_for(client.ws.close(code=1013), self._send_timeout)
+        except Exception:
+            pass
+
+    def _publish(self, data: dict) -> dict | None:
+        """Advance the published state to `data`; the message to send, or None if unchanged."""
+        account   = data.get("account")
+        positions = {p["ticket"]: p for p in data.get("positions") or ()}
+
+        # A (dis)appearing account or a changed field set is not worth diffing
+        full = (
+            account is None or self._account is None
+            or account.keys() != self._account.keys()
+        )
+        if full:
+            message = None if (account == self._account and positions == self._positions) else {}
+        else:
+            message = {}
+            account_diff = _diff_fields(self._account, account)
+            if account_diff:
+                message["account"] = account_diff
+            positions_diff = _diff_positions(self._positions, positions)
+            if positions_diff:
+                message["positions"] = positions_diff
+            if not message:
+                message = None
+
+        self._account   = account
+        self._positions = positions
+        self._timestamp = data.get("timestamp")
+        if message is None:
+            return None
+
+        self._seq += 1
+        if full:
+            return self._snapshot_message()
+        return {"type": "delta", "seq": self._seq, "timestamp": self._timestamp, **message}
 
     async def broadcast(self, data: dict):
-        if not self._connections:
+        """
+        Publish a new state. The frame is encoded once and queued for every
+        client; their writer tasks send it, so the caller (polling_loop)
+        never waits on client sockets.
+        """
+        message = self._publish(data)
+        if message is None or not self._clients:
             return
-        message = json.dumps(data, default=str)
-        dead = set()
-        async with self._lock:
-            conns = set(self._connections)
-        for ws in conns:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                dead.add(ws)
-        # Usuń martwe połączenia
-        if dead:
-            async with self._lock:
-                self._connections -= dead
+        text = encode(message)
+        for client in list(self._clients.values()):
+            client.push(text)
+
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "seq":     self._seq,
+            "evicted": self.evicted,
+            "queues": [
+                {"id": c.id, "depth": len(c.queue), "sent": c.sent, "dropped": c.dropped}
+                for c in self._clients.values()
+            ],
+        }
 
 
 ws_manager = WebSocketManager()
@@ -0,0 +1,95 @@
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from calendar_cache import CalendarCache, month_bounds, year_payload  # noqa: E402
+
+
+class CalendarCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "calendar.sqlite3"
+        self.cache = CalendarCache(self.db_path)
+        self.calls = 0
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def _compute(self):
+        self.calls += 1
+        return {"days": {"2025-03-03": {"pnl": 1.5, "trades": self.calls}}, "weeks": {1: {"pnl": 1.5, "trading_days": 1}}}
+
+    def test_month_is_computed_once_while_fingerprint_is_unchanged(self):
+        first = self.cache.get_or_compute("mt5", 1, 2025, 3, "4:99", self._compute)
+        second = self.cache.get_or_compute("mt5", 1, 2025, 3, "4:99", self._compute)
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first["weeks"], {"1": {"pnl": 1.5, "trading_days": 1}})
+
+    def test_new_deal_in_month_triggers_recompute(self):
+        self.cache.get_or_compute("mt5", 1, 2025, 3, "4:99", self._compute)
+        result = self.cache.get_or_compute("mt5", 1, 2025, 3, "5:101", self._compute)
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(result["days"]["2025-03-03"]["trades"], 2)
+
+    def test_entries_are_persisted_per_broker_and_account(self):
+        self.cache.get_or_compute("mt5", 1, 2025, 3, "4:99", self._compute)
+        self.cache.close()
+
+        reopened = CalendarCache(self.db_path)
+        try:
+            reopened.get_or_compute("mt5", 1, 2025, 3, "4:99", self._compute)
+            reopened.get_or_compute("ctrader", 1, 2025, 3, "4:99", self._compute)
+        finally:
+            reopened.close()
+
+        self.assertEqual(self.calls, 2)
+
+    def test_year_recomputes_only_stale_months_in_one_call(self):
+        batches = []
+
+        def compute(stale):
+            batches.append(list(stale))
+            return {m: {"days": {f"2025-{m:02d}-01": {"pnl": float(m), "trades": 1, "wins": 1, "losses": 0}},
+                        "weeks": {}} for m in stale if m != 2}
+
+        fingerprints = {m: "0:0" for m in range(1, 13)}
+        self.cache.get_or_compute_year("mt5", 1, 2025, fingerprints, compute)
+        fingerprints[3] = "1:7"
+        months = self.cache.get_or_compute_year("mt5", 1, 2025, fingerprints, compute)
+
+        self.assertEqual(batches, [list(range(1, 13)), [3]])
+        self.assertEqual(months[2], {"days": {}, "weeks": {}})
+        self.assertEqual(len(months), 12)
+
+    def test_year_payload_adds_month_and_year_totals(self):
+        march = {"days": {
+            "2025-03-03": {"pnl": 10.5, "trades": 3, "wins": 2, "losses": 1, "win_rate": 66.67},
+            "2025-03-04": {"pnl": -4.25, "trades": 1, "wins": 0, "losses": 1, "win_rate": 0.0},
+        }, "weeks": {"1": {"pnl": 6.25, "trading_days": 2}}}
+
+        payload = year_payload(2025, {3: march})
+
+        self.assertEqual(sorted(payload["months"], key=int), [str(m) for m in range(1, 13)])
+        self.assertEqual(payload["months"]["3"]["totals"],
+                         {"pnl": 6.25, "trades": 4, "wins": 2, "losses": 2, "trading_days": 2})
+        self.assertEqual(payload["months"]["1"]["totals"]["trades"], 0)
+        self.assertEqual(payload["totals"], payload["months"]["3"]["totals"])
+
+    def test_month_bounds_are_utc(self):
+        start, end = month_bounds(2024, 12)
+        self.assertEqual(datetime.fromtimestamp(start, timezone.utc), datetime(2024, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(datetime.fromtimestamp(end, timezone.utc), datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+import ct_backfill  # noqa: E402
+from ct_backfill import TokenBucket, backfill, split_windows  # noqa: E402
+from ct_deal_store import CtDealStore  # noqa: E402
+
+DAY = 86_400_000
+T0 = 1_700_000_000_000
+
+
+class _FakeDeal(SimpleNamespace):
+    def SerializeToString(self):
+        return json.dumps(vars(self)).encode("utf-8")
+
+
+def _decode(payload):
+    return _FakeDeal(**json.loads(payload))
+
+
+class _FakeServer:
+    """Newest `page_rows` deals of a range per request, like ProtoOADealListRes."""
+
+    def __init__(self, deals, page_rows=3, fail=()):
+        self.deals = deals
+        self.page_rows = page_rows
+        self.fail = set(fail)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch_page(self, lo, hi):
+        self.calls.append((lo, hi))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if lo in self.fail:
+                raise RuntimeError("REQUEST_FREQUENCY_EXCEEDED")
+            hits = [d for d in self.deals if lo <= d.executionTimestamp <= hi]
+            return hits[-self.page_rows:], len(hits) > self.page_rows
+        finally:
+            self.in_flight -= 1
+
+
+class CtBackfillTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = CtDealStore(Path(self.tmp.name) / "ct_deals.sqlite3", decode=_decode)
+        self.addCleanup(self.store.close)
+        self.bucket = TokenBucket(rate=10_000)
+        self.deals = [_FakeDeal(dealId=i, executionTimestamp=T0 + i * DAY // 4) for i in range(120)]
+
+    def test_windows_cover_the_range(self):
+        self.assertEqual(split_windows(0, 25, 10), [(0, 10), (10, 20), (20, 25)])
+        self.assertEqual(split_windows(5, 5, 10), [])
+
+    async def test_pages_and_windows_fetch_every_deal(self):
+        server = _FakeServer(self.deals)
+
+        run = await backfill(7, T0, T0 + 30 * DAY, server.fetch_page, self.store,
+                             bucket=self.bucket, concurrency=3, window_ms=7 * DAY)
+
+        self.assertEqual([d.dealId for d in self.store.deals(7)], list(range(120)))
+        self.assertEqual(run.added, 120)
+        self.assertEqual((run.windows, run.windows_done, run.failed), (5, 5, 0))
+        self.assertGreater(run.pages, run.windows)               # hasMore was followed
+        self.assertLessEqual(server.max_in_flight, 3)
+        self.assertTrue(all(hi - lo <= 7 * DAY for lo, hi in server.calls))
+        self.assertEqual(run.synced_to, T0 + 30 * DAY)
+        self.assertEqual(ct_backfill.progress()[-1]["added"], 120)
+
+    async def test_failed_window_limits_synced_to(self):
+        server = _FakeServer(self.deals, fail={T0 + 14 * DAY})
+        ct_backfill.RETRY_DELAY, delay = 0.001, ct_backfill.RETRY_DELAY
+        self.addCleanup(setattr, ct_backfill, "RETRY_DELAY", delay)
+
+        run = await backfill(7, T0, T0 + 30 * DAY, server.fetch_page, self.store,
+                             bucket=self.bucket, concurrency=1, window_ms=7 * DAY)
+
+        self.assertEqual(run.failed, 1)
+        self.assertEqual(run.synced_to, T0 + 14 * DAY)
+        self.assertEqual(server.calls.count((T0 + 14 * DAY, T0 + 21 * DAY)), ct_backfill.RETRIES + 1)
+
+    async def test_token_bucket_spaces_requests(self):
+        bucket = TokenBucket(rate=50, burst=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        for _ in range(6):
+            await bucket.acquire()
+
+        self.assertGreaterEqual(loop.time() - start, 5 / 50 * 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
+import asyncio
 import sys
+import threading
 import types
 import unittest
 from pathlib import Path
@@ -9,6 +11,7 @@ ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "mt5_server"))
 
 import ct_client  # noqa: E402
+from config import settings  # noqa: E402
 
 
 class _PayloadTypeMessage:
@@ -70,6 +73,10 @@ class ProtoOASymbolsListRes(_PayloadTypeMessage):
     payload_type = 103
 
 
+class ProtoOAExecutionEvent(_PayloadTypeMessage):
+    payload_type = 110
+
+
 class ProtoOAErrorRes(_PayloadTypeMessage):
     payload_type = 199
 
@@ -94,6 +101,14 @@ class ProtoOACashFlowHistoryListRes(_PayloadTypeMessage):
     payload_type = 109
 
 
+class ProtoOADealListReq:
+    def __init__(self):
+        self.ctidTraderAccountId = None
+        self.fromTimestamp = None
+        self.toTimestamp = None
+        self.maxRows = None
+
+
 def install_fake_ctrader_modules(mode):
     reactor_module = types.ModuleType("twisted.internet")
 
@@ -122,11 +137,13 @@ def install_fake_ctrader_modules(mode):
         "ProtoOASubscribeSpotsReq": ProtoOASubscribeSpotsReq,
         "ProtoOASpotEvent": ProtoOASpotEvent,
         "ProtoOADealListRes": ProtoOADealListRes,
+        "ProtoOAExecutionEvent": ProtoOAExecutionEvent,
         "ProtoOAErrorRes": ProtoOAErrorRes,
         "ProtoOAGetAccountListByAccessTokenReq": ProtoOAGetAccountListByAccessTokenReq,
         "ProtoOAGetAccountListByAccessTokenRes": ProtoOAGetAccountListByAccessTokenRes,
         "ProtoOACashFlowHistoryListReq": ProtoOACashFlowHistoryListReq,
         "ProtoOACashFlowHistoryListRes": ProtoOACashFlowHistoryListRes,
+        "ProtoOADealListReq": ProtoOADealListReq,
     }.items():
         setattr(pb2_module, name, obj)
 
@@ -213,6 +230,7 @@ class CtClientTests(unittest.TestCase):
         ct_client._error = None
         ct_client._account_id = None
         ct_client._symbol_map.clear()
+        ct_client._reset_positions()
 
     def test_resolve_protobuf_endpoint_prefers_live_or_demo_by_flag(self):
         endpoints = types.SimpleNamespace(
@@ -282,5 +300,198 @@ class CtClientTests(unittest.TestCase):
         self.assertEqual(err, "bad token")
 
 
+def _position(position_id, volume=100, status=1, symbol_id=1):
+    return types.SimpleNamespace(
+        positionId=position_id,
+        positionStatus=status,
+        price=1.1,
+        tradeData=types.SimpleNamespace(symbolId=symbol_id, tradeSide=1, volume=volume),
+    )
+
+
+class CtPositionTableTests(unittest.TestCase):
+    def setUp(self):
+        ct_client._symbol_map.clear()
+        ct_client._symbol_map[1] = "EURUSD"
+        ct_client._reset_positions()
+
+    def tearDown(self):
+        ct_client._reset_positions()
+
+    def _tickets(self):
+        return [p["ticket"] for p in ct_client.get_snapshot()["positions"]]
+
+    def test_execution_events_update_the_table_incrementally(self):
+        self.assertTrue(ct_client._apply_position(_position(1)))
+        self.assertTrue(ct_client._apply_position(_position(2)))
+        self.assertTrue(ct_client._apply_position(_position(1, volume=50)))    # partial close
+        self.assertEqual(self._tickets(), [1, 2])
+        self.assertEqual(ct_client.get_snapshot()["positions"][0]["volume"], 0.5)
+
+        self.assertTrue(ct_client._apply_position(_position(2, status=2)))     # closed
+        self.assertFalse(ct_client._apply_position(_position(9, status=2)))    # unknown close
+        self.assertEqual(self._tickets(), [1])
+
+    def test_reconcile_replaces_the_table_and_reports_drift(self):
+        ct_client._apply_position(_position(1))
+        ct_client._apply_position(_position(2))
+
+        drift = ct_client._replace_positions([_position(1, volume=30), _position(3)])
+
+        self.assertEqual(drift, 3)      # 1 resized, 2 gone, 3 new
+        self.assertEqual(self._tickets(), [1, 3])
+        self.assertEqual(ct_client._replace_positions([_position(1, volume=30), _position(3)]), 0)
+
+    def test_spots_are_subscribed_once_per_symbol(self):
+        sent = []
+        client = types.SimpleNamespace(send=sent.append)
+        fake_modules = install_fake_ctrader_modules("connect_success")
+
+        with patch.dict(sys.modules, fake_modules, clear=False):
+            ct_client._subscribe_spots(client, 12345, {1, 2})
+            ct_client._subscribe_spots(client, 12345, {2, 3})
+
+        self.assertEqual([sorted(req.symbolId) for req in sent], [[1, 2], [3]])
+
+
+class CtSpotRepricingTests(unittest.TestCase):
+    def setUp(self):
+        ct_client._symbol_map.clear()
+        ct_client._symbol_map.update({1: "EURUSD", 2: "GBPUSD"})
+        ct_client._spot_prices.clear()
+        ct_client._reset_positions()
+        ct_client._emit_pending = False
+        ct_client._last_emit = 0.0
+        ct_client._snapshot["account"] = {"balance": 1000.0, "margin": 100.0, "equity": 1000.0}
+        for pid, sym in [(1, 1), (2, 1), (3, 2)]:
+            ct_client._apply_position(_position(pid, symbol_id=sym))
+
+    def tearDown(self):
+        ct_client._reset_positions()
+        ct_client._snapshot.pop("account", None)
+        ct_client._spot_prices.clear()
+
+    def test_spot_tick_reprices_only_that_symbol(self):
+        before = {p["ticket"]: p for p in ct_client.get_snapshot()["positions"]}
+        ct_client._spot_prices[1] = {"bid": 1.1009, "ask": 1.1010}
+        self.assertTrue(ct_client._reprice_symbol(1))
+        self.assertFalse(ct_client._reprice_symbol(99))
+
+        rows = ct_client._positions_parsed
+        self.assertEqual(rows[1]["profit_raw"], 100.0)      # 0.001 × 1 lot × 100 000
+        self.assertIs(rows[3], before[3])                    # other symbol untouched
+        self.assertAlmostEqual(ct_client._floating, 200.0)
+
+    def test_emit_publishes_equity_from_running_floating(self):
+        ct_client._spot_prices[1] = {"bid": 1.1009, "ask": 1.1010}
+        ct_client._reprice_symbol(1)
+        ct_client._spot_prices[2] = {"bid": 1.0995, "ask": 1.0996}
+        ct_client._reprice_symbol(2)
+
+        ct_client._emit_prices()
+
+        account = ct_client.get_snapshot()["account"]
+        self.assertEqual(account["floating_pnl"], 160.0)
+        self.assertEqual(account["equity"], 1160.0)
+        self.assertEqual(account["free_margin"], 1060.0)
+
+    def test_emission_is_throttled(self):
+        scheduled = []
+        reactor = types.SimpleNamespace(callLater=lambda delay, fn: scheduled.append((delay, fn)))
+        fake = types.ModuleType("twisted.internet")
+        fake.reactor = reactor
+
+        with patch.dict(sys.modules, {"twisted.internet": fake}):
+            ct_client._last_emit = ct_client.time.monotonic()
+            for _ in range(50):
+                ct_client._schedule_emit()
+
+        self.assertEqual(len(scheduled), 1)
+        delay, fn = scheduled[0]
+        self.assertGreater(delay, 0)
+        self.assertLessEqual(delay, 1.0 / settings.CT_SPOT_EMIT_RATE)
+        fn()
+        self.assertFalse(ct_client._emit_pending)
+
+
+class _ReactorThreadClient:
+    """Answers each request from another thread, like the Twisted reactor."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.threads = []
+
+    def send(self, req, clientMsgId=None):
+        thread = threading.Thread(target=self.answer, args=(req, clientMsgId))
+        self.threads.append(thread)
+        thread.start()
+
+
+class CtRequestTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.dict(sys.modules, install_fake_ctrader_modules("requests"), clear=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ct_client._connected = True
+        ct_client._account_id = 7
+        ct_client._pending.clear()
+        self.addCleanup(setattr, ct_client, "_connected", False)
+        self.addCleanup(setattr, ct_client, "_client", None)
+
+    async def test_deals_resolve_from_the_reactor_thread(self):
+        def answer(req, corr_id):
+            deals = [types.SimpleNamespace(dealId=i) for i in range(req.fromTimestamp, req.toTimestamp)]
+            ct_client._resolve(corr_id, types.SimpleNamespace(deal=deals, hasMore=False))
+
+        ct_client._client = _ReactorThreadClient(answer)
+        first, second = await asyncio.gather(ct_client.fetch_deal_page(0, 3), ct_client.fetch_deal_page(10, 12))
+
+        self.assertEqual([d.dealId for d in first[0]], [0, 1, 2])
+        self.assertEqual([d.dealId for d in second[0]], [10, 11])
+        self.assertFalse(first[1])
+        self.assertEqual(ct_client._pending, {})
+
+    async def test_registration_time_is_asked_for_until_a_trader_response_arrives(self):
+        sent = []
+
+        def answer(req, corr_id):
+            sent.append(type(req).__name__)
+            trader = types.SimpleNamespace(registrationTimestamp=1_600_000_000_000)
+            ct_client._resolve(corr_id, types.SimpleNamespace(trader=trader))
+
+        ct_client._client = _ReactorThreadClient(answer)
+        self.addCleanup(setattr, ct_client, "_registered_ms", None)
+        ct_client._registered_ms = None
+        self.assertEqual(await ct_client.fetch_registration_ms(), 1_600_000_000_000)
+        ct_client._registered_ms = 1_500_000_000_000
+        self.assertEqual(await ct_client.fetch_registration_ms(), 1_500_000_000_000)
+
+        self.assertEqual(sent, ["ProtoOATraderReq"])
+
+    async def test_error_response_fails_only_that_request(self):
+        def answer(req, corr_id):
+            ct_client._reject(corr_id, ct_client.CtRequestError("TOO_MANY_REQUESTS"))
+
+        ct_client._client = _ReactorThreadClient(answer)
+        with self.assertRaises(ct_client.CtRequestError):
+            await ct_client.request(ProtoOADealListReq(), timeout=1.0)
+        self.assertEqual(await ct_client.fetch_cash_flows(0, 1), [])
+
+    async def test_timeout_drops_the_pending_request(self):
+        ct_client._client = _ReactorThreadClient(lambda req, corr_id: None)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await ct_client.request(ProtoOADealListReq(), timeout=0.05)
+
+        self.assertEqual(ct_client._pending, {})
+        self.assertFalse(ct_client._resolve("late", object()))
+
+    async def test_disconnect_fails_requests_in_flight(self):
+        ct_client._client = _ReactorThreadClient(lambda req, corr_id: ct_client._reject_all("gone"))
+
+        with self.assertRaises(ct_client.CtRequestError):
+            await ct_client.request(ProtoOADealListReq(), timeout=1.0)
+
+
 if __name__ == "__main__":
     unittest.main()
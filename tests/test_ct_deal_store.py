@@ -0,0 +1,84 @@
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from ct_deal_store import CtDealStore  # noqa: E402
+
+
+class _FakeDeal(SimpleNamespace):
+    def SerializeToString(self):
+        return json.dumps(vars(self)).encode("utf-8")
+
+
+def _decode(payload):
+    return _FakeDeal(**json.loads(payload))
+
+
+class _FakeServer:
+    def __init__(self, deals):
+        self.deals = list(deals)
+        self.calls = []
+
+    def fetch_deals(self, from_ms, to_ms):
+        self.calls.append((from_ms, to_ms))
+        return [d for d in self.deals if from_ms <= d.executionTimestamp <= to_ms]
+
+
+def _sync(store, account_id, server):
+    """What ct_poller does around the backfill: window → fetched deals → mark."""
+    window = store.sync_window(account_id, max_age=0)
+    added = store.add(account_id, server.fetch_deals(*window))
+    store.mark_synced(account_id, window[1])
+    return added
+
+
+class CtDealStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "ct_deals.sqlite3"
+        self.store = CtDealStore(self.db_path, decode=_decode)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_sync_requests_only_tail_after_backfill(self):
+        t0 = 1_700_000_000_000
+        server = _FakeServer([
+            _FakeDeal(dealId=1, executionTimestamp=t0),
+            _FakeDeal(dealId=2, executionTimestamp=t0 + 5_000),
+        ])
+        self.assertEqual(_sync(self.store, 7, server), 2)
+
+        server.deals.append(_FakeDeal(dealId=3, executionTimestamp=int(time.time() * 1000)))
+        self.assertEqual(_sync(self.store, 7, server), 1)
+
+        self.assertGreater(server.calls[1][0], t0 - 120_000)
+        self.assertEqual([d.dealId for d in self.store.deals(7)], [1, 2, 3])
+        self.assertEqual([d.dealId for d in self.store.deals(7, since_ms=t0 + 1)], [2, 3])
+
+    def test_store_survives_reopen(self):
+        server = _FakeServer([_FakeDeal(dealId=9, executionTimestamp=1_700_000_000_000)])
+        _sync(self.store, 7, server)
+        self.store.close()
+
+        reopened = CtDealStore(self.db_path, decode=_decode)
+        try:
+            self.assertEqual(reopened.watermark(7), 1_700_000_000_000)
+            self.assertEqual(reopened.synced_to(7), server.calls[0][1])
+            self.assertEqual(reopened.deals(8), [])
+            self.assertEqual(reopened.deals(7)[0].dealId, 9)
+        finally:
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+import ct_client  # noqa: E402
+from ct_live import CtLiveBridge  # noqa: E402
+
+
+class _Recorder:
+    def __init__(self):
+        self.pushed = []
+
+    async def broadcast(self, data):
+        self.pushed.append(data)
+
+
+class CtLiveBridgeTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.state = {"account": {"equity": 1000.0}, "positions": [], "timestamp": "t0"}
+        patcher = patch.object(ct_client, "get_snapshot", side_effect=lambda: dict(self.state))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ws = _Recorder()
+        self.bridge = CtLiveBridge(interval=0.05)
+        self.addCleanup(self.bridge.stop)
+
+    async def test_start_pushes_current_state(self):
+        self.bridge.start(self.ws)
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(self.ws.pushed, [self.state])
+
+    async def test_reactor_bursts_are_throttled_and_latest_state_wins(self):
+        self.bridge.start(self.ws)
+        await asyncio.sleep(0.01)
+
+        def reactor_burst():
+            for i in range(200):
+                self.state = {**self.state, "account": {"equity": 1000.0 + i}}
+                ct_client._notify_change()
+
+        thread = threading.Thread(target=reactor_burst)
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.15)
+
+        self.assertLessEqual(len(self.ws.pushed), 4)
+        self.assertEqual(self.ws.pushed[-1]["account"]["equity"], 1199.0)
+        self.assertEqual(self.bridge.stats()["notifications"], 201)
+
+    async def test_stop_detaches_from_ct_client(self):
+        self.bridge.start(self.ws)
+        self.bridge.stop()
+        ct_client._notify_change()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(self.ws.pushed, [])
+
+    async def test_stop_from_another_thread_cancels_on_the_loop(self):
+        self.bridge.start(self.ws)
+        await asyncio.sleep(0.01)
+        ct_client._notify_change()              # push loop now waits out the interval
+        await asyncio.sleep(0)
+        task = self.bridge._task
+
+        thread = threading.Thread(target=self.bridge.stop)
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+
+        self.assertTrue(task.cancelled())
+        self.assertEqual(len(self.ws.pushed), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+import deal_columns  # noqa: E402
+
+
+def _deal(ticket, position_id, time, deal_type, entry, price=1.1, profit=0.0,
+          volume=0.1, commission=0.0, swap=0.0, symbol="EURUSD"):
+    return SimpleNamespace(
+        ticket=ticket, position_id=position_id, time=time, type=deal_type, entry=entry,
+        symbol=symbol, volume=volume, price=price, profit=profit, swap=swap,
+        commission=commission,
+    )
+
+
+_HISTORY = [
+    _deal(1, 0, 1_000, 2, 0, profit=1000.0),                              # deposit
+    _deal(2, 10, 2_000, 0, 0, price=1.1000, commission=-1.0),             # BUY in
+    _deal(3, 10, 2_600, 1, 1, price=1.1010, profit=6.0, volume=0.05),     # partial out
+    _deal(4, 10, 3_000, 1, 1, price=1.1020, profit=10.0, volume=0.05),    # final out
+    _deal(5, 11, 4_000, 1, 0, price=1.2000),                              # SELL in
+    _deal(6, 11, 4_500, 0, 1, price=1.2030, profit=-30.0, swap=-0.5),     # out
+    _deal(7, 12, 5_000, 0, 0, price=1.3000),                              # still open
+]
+
+
+class DealColumnsTests(unittest.TestCase):
+    def setUp(self):
+        self.deals = deal_columns.deals_to_array(list(reversed(_HISTORY)))
+
+    def test_deals_to_array_sorts_by_time(self):
+        self.assertEqual(self.deals["ticket"].tolist(), [1, 2, 3, 4, 5, 6, 7])
+
+    def test_aggregate_trades_groups_positions_and_skips_open_ones(self):
+        trades = deal_columns.aggregate_trades(self.deals, lambda symbol: 0.0001)
+
+        self.assertEqual(trades["position_id"].tolist(), [10, 11])
+        self.assertEqual(trades["pnl_net"].tolist(), [15.0, -30.5])
+        self.assertEqual(trades["volume"].tolist(), [0.1, 0.1])
+        self.assertEqual(trades["is_buy"].tolist(), [True, False])
+        self.assertEqual(trades["pips"].tolist(), [20.0, -30.0])
+        self.assertEqual((trades["close_time"] - trades["open_time"]).tolist(), [1_000, 500])
+
+    def test_trade_stats_matches_hand_computed_values(self):
+        trades = deal_columns.aggregate_trades(self.deals, lambda symbol: 0.0001)
+        stats = deal_columns.trade_stats(trades, balance_start=1000.0, balance_end=984.5)
+
+        self.assertEqual(stats["total_trades"], 2)
+        self.assertEqual(stats["winning_trades"], 1)
+        self.assertEqual(stats["profit"], -15.5)
+        self.assertEqual(stats["gain_pct"], -1.55)
+        self.assertEqual(stats["profit_factor"], 0.49)
+        self.assertEqual(stats["longs_won"], 1)
+        self.assertEqual(stats["shorts_won"], 0)
+        self.assertEqual(stats["best_trade_eur"], 15.0)
+        self.assertEqual(stats["avg_trade_sec"], 750)
+        self.assertAlmostEqual(stats["ahpr_pct"], (0.015 + -30.5 / 1015.0) / 2 * 100, places=4)
+
+    def test_balance_deltas_counts_deposits_and_closed_pnl_only(self):
+        deltas = deal_columns.balance_deltas(self.deals)
+        self.assertEqual(deltas.tolist(), [1000.0, 0.0, 6.0, 10.0, 0.0, -30.5, 0.0])
+
+    def test_balance_index_answers_point_and_range_queries(self):
+        index = deal_columns.BalanceIndex(self.deals)
+
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.balance_at(1_000), 0.0)
+        self.assertEqual(index.balance_at(3_000), 1006.0)
+        self.assertEqual(index.balance_at(10_000), 985.5)
+        self.assertEqual(index.net_deposits_at(10_000), 1000.0)
+        self.assertEqual((index.deposits, index.withdrawals), (1000.0, 0.0))
+        self.assertEqual(index.first_trade_ts, 2_600)
+        self.assertAlmostEqual(index.gain_pct(2_000), -1.45)
+        self.assertAlmostEqual(index.gain_pct(2_000, 3_001), 1.6)
+        self.assertAlmostEqual(index.max_drawdown_pct(), (1016.0 - 985.5) / 1016.0 * 100)
+        self.assertEqual(index.max_drawdown_pct(since=1_000, until=3_001), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
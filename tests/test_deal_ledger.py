@@ -0,0 +1,117 @@
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from deal_ledger import DealLedger  # noqa: E402
+
+
+def _deal(ticket, time, profit=10.0, entry=1, deal_type=0, position_id=None):
+    return SimpleNamespace(
+        ticket=ticket,
+        position_id=position_id if position_id is not None else ticket,
+        time=time,
+        type=deal_type,
+        entry=entry,
+        symbol="EURUSD",
+        volume=0.1,
+        price=1.1,
+        profit=profit,
+        swap=0.0,
+        commission=-0.5,
+    )
+
+
+class _FakeTerminal:
+    def __init__(self, deals):
+        self.deals = list(deals)
+        self.calls = []
+
+    def history_deals_get(self, date_from, date_to):
+        self.calls.append((date_from, date_to))
+        lo = date_from.timestamp()
+        return tuple(d for d in self.deals if d.time >= lo) or None
+
+
+class DealLedgerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / "ledger.sqlite3"
+        self.ledger = DealLedger(self.db_path)
+
+    def tearDown(self):
+        self.ledger.close()
+        self.tmp.cleanup()
+
+    def test_first_sync_backfills_full_history(self):
+        terminal = _FakeTerminal([_deal(1, 1_600_000_000), _deal(2, 1_600_000_600)])
+
+        added = self.ledger.sync(42, terminal.history_deals_get, max_age=0)
+
+        self.assertEqual(added, 2)
+        self.assertEqual(terminal.calls[0][0], datetime(2000, 1, 1))
+        self.assertEqual([d.ticket for d in self.ledger.deals(42)], [1, 2])
+
+    def test_later_sync_fetches_only_tail_and_ignores_duplicates(self):
+        old = 1_600_000_000
+        terminal = _FakeTerminal([_deal(1, old), _deal(2, old + 60)])
+        self.ledger.sync(42, terminal.history_deals_get, max_age=0)
+
+        terminal.deals.append(_deal(3, old + 120))
+        added = self.ledger.sync(42, terminal.history_deals_get, max_age=0)
+
+        self.assertEqual(added, 1)
+        self.assertGreater(terminal.calls[1][0], datetime(2020, 1, 1))
+        self.assertEqual([d.ticket for d in self.ledger.deals(42)], [1, 2, 3])
+
+    def test_deals_are_keyed_by_login_and_survive_reopen(self):
+        self.ledger.sync(1, _FakeTerminal([_deal(1, 1_600_000_000)]).history_deals_get)
+        self.ledger.sync(2, _FakeTerminal([_deal(1, 1_600_000_000), _deal(5, 1_600_002_000)]).history_deals_get)
+        self.ledger.close()
+
+        reopened = DealLedger(self.db_path)
+        try:
+            self.assertEqual(len(reopened.deals(1)), 1)
+            self.assertEqual(len(reopened.deals(2)), 2)
+            self.assertEqual([d.ticket for d in reopened.deals(2, since=1_600_001_000)], [5])
+            self.assertEqual(reopened.watermark(2), 1_600_002_000)
+        finally:
+            reopened.close()
+
+    def test_derived_results_are_memoized_per_version(self):
+        terminal = _FakeTerminal([_deal(1, 1_600_000_000)])
+        self.ledger.sync(42, terminal.history_deals_get, max_age=0)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(self.ledger.deals(42))
+
+        self.assertEqual(self.ledger.memo(42, "count", compute), 1)
+        self.assertEqual(self.ledger.memo(42, "count", compute), 1)
+        self.assertEqual(self.ledger.sync(42, terminal.history_deals_get, max_age=0), 0)
+        self.assertEqual(self.ledger.memo(42, "count", compute), 1)
+        self.assertEqual(len(calls), 1)
+
+        terminal.deals.append(_deal(2, 1_600_000_060))
+        self.ledger.sync(42, terminal.history_deals_get, max_age=0)
+        self.assertEqual(self.ledger.memo(42, "count", compute), 2)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.ledger.array(42)["ticket"].tolist(), [1, 2])
+
+    def test_sync_is_skipped_while_recent(self):
+        terminal = _FakeTerminal([_deal(1, 1_600_000_000)])
+        self.ledger.sync(42, terminal.history_deals_get)
+        self.ledger.sync(42, terminal.history_deals_get)
+
+        self.assertEqual(len(terminal.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
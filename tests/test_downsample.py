@@ -0,0 +1,57 @@
+import math
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from downsample import POINT_BUDGETS, downsample, minmax_indices, point_budget  # noqa: E402
+
+
+class DownsampleTests(unittest.TestCase):
+    def setUp(self):
+        self.values = [1000 + 50 * math.sin(i / 40) + (i % 7) for i in range(10_000)]
+        self.values[4321] = 2500.0   # spike
+        self.values[7777] = -300.0   # crash
+
+    def test_short_series_is_returned_unchanged(self):
+        self.assertEqual(minmax_indices([1.0, 2.0, 3.0], 10).tolist(), [0, 1, 2])
+
+    def test_budget_endpoints_and_extremes_are_kept(self):
+        idx = minmax_indices(self.values, 500).tolist()
+
+        self.assertLessEqual(len(idx), 500)
+        self.assertEqual(idx, sorted(set(idx)))
+        self.assertEqual((idx[0], idx[-1]), (0, 9_999))
+        self.assertIn(4321, idx)
+        self.assertIn(7777, idx)
+
+    def test_every_bucket_keeps_its_min_and_max(self):
+        values = [0, 5, 1, 9, 2, 8, 3, 7, 4, 6]
+        # 8 points → 3 buckets over the inner values: [5 1 9] [2 8 3] [7 4]
+        idx = minmax_indices(values, 8).tolist()
+
+        self.assertEqual(idx, [0, 2, 3, 4, 5, 7, 8, 9])
+
+    def test_downsample_selects_point_dicts(self):
+        points = [{"ts": str(i), "balance": v} for i, v in enumerate(self.values)]
+
+        thinned = downsample(points, 100)
+
+        self.assertLessEqual(len(thinned), 100)
+        self.assertEqual(max(p["balance"] for p in thinned), 2500.0)
+        self.assertEqual(min(p["balance"] for p in thinned), -300.0)
+        self.assertIs(downsample(points, None), points)
+
+    def test_point_budget_rounds_down_to_a_fixed_set(self):
+        self.assertIsNone(point_budget(None))
+        self.assertEqual(point_budget(10), 10)
+        self.assertEqual(point_budget(777), 500)
+        self.assertEqual(point_budget(10**9), POINT_BUDGETS[-1])
+        self.assertEqual(len({point_budget(n) for n in range(10, 100_000)}), len(POINT_BUDGETS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from equity_history import (  # noqa: E402
+    RECORD, TIERS, EquityHistory, EquityHistoryStore, encode_series, pick_tier,
+)
+
+T0 = 1_741_000_000 - 1_741_000_000 % 900      # aligned to a 15-minute bucket
+
+
+def _fill(history, seconds, every=5):
+    for i in range(0, seconds, every):
+        history.add(1000.0 + i, 1000.0, float(i) / 4, ts=T0 + i)
+
+
+class EquityHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "mt5_1.bin"
+
+    def test_tiers_roll_up_to_the_last_sample_of_each_bucket(self):
+        history = EquityHistory()
+        _fill(history, 2 * 3600)
+        now = T0 + 2 * 3600
+
+        fine = history.series("6h", "5s", now=now)
+        minute = history.series("6h", "1m", now=now)
+        quarter = history.series("6h", "15m", now=now)
+
+        self.assertEqual(fine.ts.size, 2 * 720)
+        self.assertEqual(minute.ts.size, 120)
+        self.assertEqual(quarter.ts.size, 8)
+        self.assertEqual(minute.equity[0], 1055.0)              # last 5 s sample of minute 0
+        self.assertEqual(quarter.equity[-1], 1000.0 + 2 * 3600 - 5)
+        self.assertEqual(history.series("1h", now=now).ts[0], now - 3600)
+
+    def test_ring_wraps_and_stays_chronological(self):
+        history = EquityHistory()
+        _fill(history, TIERS[0].step * TIERS[0].capacity + 600)
+
+        fine = history.series("all", "5s")
+
+        self.assertEqual(fine.ts.size, TIERS[0].capacity)
+        self.assertTrue(np.all(np.diff(fine.ts) == 5))
+        self.assertEqual(fine.ts[-1], T0 + TIERS[0].step * TIERS[0].capacity + 595)
+
+    def test_range_picks_the_finest_covering_tier(self):
+        self.assertEqual(pick_tier(3600).name, "5s")
+        self.assertEqual(pick_tier(7 * 86_400).name, "1m")
+        self.assertEqual(pick_tier(90 * 86_400).name, "15m")
+        self.assertEqual(pick_tier(None).name, "15m")
+        self.assertEqual(pick_tier(3600, "1m").name, "1m")
+        with self.assertRaises(ValueError):
+            pick_tier(3600, "2s")
+        with self.assertRaises(ValueError):
+            EquityHistory().series("2w")
+
+    def test_encodings_match_the_classic_point_shape(self):
+        history = EquityHistory()
+        _fill(history, 30)
+        series = history.series("all", "5s")
+
+        points, media = encode_series(series)
+        self.assertEqual(media, "application/json")
+        self.assertEqual(json.loads(points)[1], {
+            "ts": datetime.utcfromtimestamp(T0 + 5).isoformat(),
+            "equity": 1005.0, "balance": 1000.0, "pnl": 1.25,
+        })
+
+        columns = json.loads(encode_series(series, "columns")[0])
+        self.assertEqual(columns["ts"][:2], [T0, T0 + 5])
+
+        raw, media = encode_series(series, "binary")
+        self.assertEqual(media, "application/octet-stream")
+        self.assertEqual(len(raw), 6 * RECORD.itemsize)
+        self.assertEqual(np.frombuffer(raw, RECORD)["equity"].tolist(), series.equity.tolist())
+        with self.assertRaises(ValueError):
+            encode_series(series, "xml")
+
+    def test_history_survives_reload_and_file_is_compacted(self):
+        history = EquityHistory(self.path)
+        _fill(history, TIERS[0].step * TIERS[0].capacity + 3600)    # a day and an hour
+        before = history.series("all", "1m")
+        history.close()
+        size_before = self.path.stat().st_size
+
+        reloaded = EquityHistory(self.path)
+
+        after = reloaded.series("all", "1m")
+        self.assertEqual(after.ts.tolist(), before.ts.tolist())
+        self.assertEqual(after.equity.tolist(), before.equity.tolist())
+        self.assertLess(self.path.stat().st_size, size_before)
+        reloaded.add(1.0, 2.0, 3.0, ts=T0 + 10 * 86_400)
+        reloaded.close()
+        self.assertEqual(EquityHistory(self.path).series("all", "15m").equity[-1], 1.0)
+
+    def test_store_keeps_one_file_per_account(self):
+        store = EquityHistoryStore(self.tmp.name)
+        store.record("mt5", 1, 10.0, 10.0, 0.0, ts=T0)
+        store.record("ctrader", 1, 20.0, 20.0, 0.0, ts=T0)
+        store.close()
+
+        self.assertEqual(sorted(p.name for p in Path(self.tmp.name).iterdir()),
+                         ["ctrader_1.bin", "mt5_1.bin"])
+
+    def test_store_does_file_work_on_its_writer_thread(self):
+        history = EquityHistory(self.path)
+        _fill(history, 60)
+        history.close()
+        threads = set()
+        append = EquityHistory._append
+
+        def _append(self, record):
+            threads.add(threading.current_thread().name)
+            append(self, record)
+
+        store = EquityHistoryStore(self.tmp.name)
+        with patch.object(EquityHistory, "_append", _append):
+            store.record("mt5", 1, 5.0, 5.0, 0.0, ts=T0 + 3600)     # likely before the file is read
+            merged = store.series("mt5", 1, "all", "5s")
+            store.close()
+
+        self.assertEqual(threads, {"equity-history"})
+        self.assertEqual(merged.ts.size, 13)
+        self.assertEqual(merged.equity[-1], 5.0)
+        self.assertEqual(EquityHistory(self.path).series("all", "5s").ts.tolist(), merged.ts.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
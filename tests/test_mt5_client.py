@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from mt5_client import BACKGROUND, INTERACTIVE, LIVE, MT5Overloaded, MT5Worker  # noqa: E402
+
+
+class MT5WorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.worker = MT5Worker(limits={LIVE: 2, INTERACTIVE: 2, BACKGROUND: 2})
+        self.gate = threading.Event()
+        # Occupy the thread so later jobs queue up behind it
+        self.blocker = self.worker.submit(self.gate.wait)
+
+    def tearDown(self):
+        self.gate.set()
+        self.worker.shutdown()
+
+    def test_higher_priority_runs_first(self):
+        order = []
+        jobs = [
+            self.worker.submit(order.append, "background", priority=BACKGROUND),
+            self.worker.submit(order.append, "interactive", priority=INTERACTIVE),
+            self.worker.submit(order.append, "live", priority=LIVE),
+        ]
+        self.gate.set()
+        for job in jobs:
+            job.result(timeout=1)
+
+        self.assertEqual(order, ["live", "interactive", "background"])
+
+    def test_full_class_is_rejected_without_affecting_others(self):
+        self.worker.submit(lambda: None, priority=BACKGROUND)
+        self.worker.submit(lambda: None, priority=BACKGROUND)
+
+        with self.assertRaises(MT5Overloaded):
+            self.worker.submit(lambda: None, priority=BACKGROUND)
+        live = self.worker.submit(lambda: "ok", priority=LIVE)
+        self.gate.set()
+
+        self.assertEqual(live.result(timeout=1), "ok")
+        stats = self.worker.stats()
+        self.assertEqual(stats["background"]["rejected"], 1)
+        self.assertEqual(stats["live"]["done"], 1)
+        self.assertIsNotNone(stats["live"]["total_ms_p95"])
+
+    def test_run_is_reentrant_and_call_is_awaitable(self):
+        self.gate.set()
+        nested = self.worker.run(lambda: self.worker.run(lambda: 42))
+        self.assertEqual(nested, 42)
+
+        result = asyncio.run(self.worker.call(lambda x: x * 2, 21, priority=LIVE))
+        self.assertEqual(result, 42)
+
+
+if __name__ == "__main__":
+    unittest.main()
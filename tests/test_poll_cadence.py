@@ -0,0 +1,40 @@
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from poll_cadence import AdaptiveInterval, market_open  # noqa: E402
+
+WEDNESDAY = datetime(2025, 3, 5, 12, 0)
+SATURDAY  = datetime(2025, 3, 8, 12, 0)
+
+
+class PollCadenceTests(unittest.TestCase):
+    def test_market_hours(self):
+        self.assertTrue(market_open(WEDNESDAY))
+        self.assertTrue(market_open(datetime(2025, 3, 7, 21, 59)))     # Friday before close
+        self.assertFalse(market_open(datetime(2025, 3, 7, 22, 0)))     # Friday close
+        self.assertFalse(market_open(SATURDAY))
+        self.assertFalse(market_open(datetime(2025, 3, 9, 21, 0)))     # Sunday before open
+        self.assertTrue(market_open(datetime(2025, 3, 9, 22, 0)))      # Sunday open
+
+    def test_idle_decays_to_maximum_and_activity_snaps_back(self):
+        cadence = AdaptiveInterval(0.5, 10.0, start=1.0)
+
+        idle = [cadence.update(0, 1, WEDNESDAY) for _ in range(6)]
+        self.assertEqual(idle, [2.0, 4.0, 8.0, 10.0, 10.0, 10.0])
+
+        self.assertEqual(cadence.update(2, 1, WEDNESDAY), 0.5)
+
+    def test_every_condition_is_needed_for_the_fast_cadence(self):
+        for positions, watchers, now in [(0, 1, WEDNESDAY), (1, 0, WEDNESDAY), (1, 1, SATURDAY)]:
+            cadence = AdaptiveInterval(0.5, 10.0, start=1.0)
+            self.assertEqual(cadence.update(positions, watchers, now), 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import threading
+import unittest
+from collections import namedtuple
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+import poller  # noqa: E402
+from equity_history import EquityHistoryStore  # noqa: E402
+
+_Info = namedtuple("_Info", "login name server currency balance equity margin margin_free margin_level profit leverage")
+
+
+def _info(equity):
+    return _Info(1, "Demo", "Demo-Server", "USD", 1000.0, equity, 0.0, 0.0, 0.0, equity - 1000.0, 100)
+
+
+class PollerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        poller.snapshot.clear()
+        poller._last_raw = None
+        poller._history_marker = None
+        poller.poll_stats.update(ticks_emitted=0, ticks_skipped=0, last_tick=None)
+        patcher = patch.object(poller, "equity_store", EquityHistoryStore(directory=None))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _run_ticks(self, infos):
+        ws = AsyncMock()
+        ws.client_count = Mock(return_value=0)
+        ticks = iter(infos)
+        sleeps = 0
+
+        async def _sleep(_):
+            nonlocal sleeps
+            sleeps += 1
+            if sleeps >= len(infos):
+                raise asyncio.CancelledError
+
+        with patch.object(poller, "ensure_connected", return_value=True), \
+             patch.object(poller, "sync_history"), \
+             patch.object(poller.mt5, "account_info", side_effect=lambda: next(ticks)), \
+             patch.object(poller.mt5, "positions_get", return_value=()), \
+             patch.object(poller.asyncio, "sleep", side_effect=_sleep):
+            with self.assertRaises(asyncio.CancelledError):
+                await poller.polling_loop(ws)
+        return ws
+
+    async def test_unchanged_ticks_skip_parse_and_broadcast(self):
+        ws = await self._run_ticks([_info(1000.0), _info(1000.0), _info(1000.0), _info(1001.0)])
+
+        self.assertEqual(ws.broadcast.await_count, 2)
+        stats = poller.get_poll_stats()
+        self.assertEqual((stats["ticks_emitted"], stats["ticks_skipped"]), (2, 2))
+        self.assertEqual(poller.get_snapshot()["account"]["equity"], 1001.0)
+
+    async def test_terminal_is_read_on_the_mt5_thread(self):
+        threads = set()
+
+        def _account_info():
+            threads.add(threading.current_thread().name)
+            return _info(1000.0)
+
+        ws = AsyncMock()
+        ws.client_count = Mock(return_value=0)
+        with patch.object(poller, "ensure_connected", return_value=True), \
+             patch.object(poller, "sync_history"), \
+             patch.object(poller.mt5, "account_info", side_effect=_account_info), \
+             patch.object(poller.mt5, "positions_get", return_value=()), \
+             patch.object(poller.asyncio, "sleep", side_effect=asyncio.CancelledError):
+            with self.assertRaises(asyncio.CancelledError):
+                await poller.polling_loop(ws)
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith("mt5"))
+
+    def test_idle_cadence_still_samples_equity_every_few_seconds(self):
+        with patch.object(poller.cadence, "current", 10.0):
+            poller._last_equity_sample = poller.time.monotonic()
+            self.assertLessEqual(poller._next_sleep(1), poller.EQUITY_EVERY)
+            poller._last_equity_sample = poller.time.monotonic() - 4.0
+            self.assertLessEqual(poller._next_sleep(1), 1.0)
+
+    def test_flat_account_sleeps_up_to_the_max_interval(self):
+        with patch.object(poller.settings, "POLL_INTERVAL_MAX", 30.0):
+            cadence = poller.AdaptiveInterval(0.5, poller.settings.POLL_INTERVAL_MAX, 1.0)
+            with patch.object(poller, "cadence", cadence):
+                for _ in range(8):
+                    cadence.update(0, 0)
+                poller._last_equity_sample = poller.time.monotonic()
+
+                self.assertGreater(cadence.current, poller.EQUITY_EVERY)
+                self.assertEqual(poller._next_sleep(0), 30.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
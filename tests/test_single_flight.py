@@ -0,0 +1,158 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+import ct_poller  # noqa: E402
+from single_flight import AsyncSingleFlight, SingleFlight  # noqa: E402
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_callers_share_one_query(self):
+        flights = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def query():
+            calls.append(1)
+            release.wait(2)
+            return "deals"
+
+        with ThreadPoolExecutor(6) as pool:
+            leader = pool.submit(flights.do, 7, query)
+            while not calls:
+                time.sleep(0.001)
+            joiners = [pool.submit(flights.do, 7, query) for _ in range(5)]
+            while flights.shared < 5:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result()] + [j.result() for j in joiners]
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["deals"] * 6)
+        self.assertEqual(flights.stats(), {"started": 1, "shared": 5, "running": 0})
+
+    def test_forced_refresh_after_the_flight_began_queries_again(self):
+        flights = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def query():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(2)
+            return len(calls)
+
+        with ThreadPoolExecutor(3) as pool:
+            leader = pool.submit(flights.do, 7, query)
+            while not calls:
+                time.sleep(0.001)
+            refresh = pool.submit(flights.do, 7, query, fresh=True)
+            while flights.started < 2:
+                time.sleep(0.001)
+            joiner = pool.submit(flights.do, 7, query)      # a plain caller still shares the first
+            while flights.shared < 1:
+                time.sleep(0.001)
+            release.set()
+            results = [leader.result(), refresh.result(), joiner.result()]
+
+        self.assertEqual(results, [1, 2, 1])
+        self.assertEqual(flights.stats(), {"started": 2, "shared": 1, "running": 0})
+
+    def test_error_reaches_every_caller_and_clears_the_flight(self):
+        flights = SingleFlight()
+
+        def fail():
+            raise RuntimeError("terminal gone")
+
+        with self.assertRaises(RuntimeError):
+            flights.do(7, fail)
+        self.assertEqual(flights.do(7, lambda: 1), 1)
+
+
+class AsyncSingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_coroutines_share_one_query(self):
+        flights = AsyncSingleFlight()
+        calls = 0
+
+        async def query():
+            nonlocal calls
+            calls += 1
+            call = calls
+            await asyncio.sleep(0.01)
+            return call
+
+        results = await asyncio.gather(
+            flights.do(7, query), flights.do(7, query), flights.do(8, query),
+        )
+
+        self.assertEqual(results, [1, 1, 2])                   # another account: its own query
+        self.assertEqual(await flights.do(7, query), 3)        # finished flights are not reused
+
+    async def test_full_history_and_sub_range_callers_share_one_sync(self):
+        calls = 0
+
+        async def sync(account_id, max_age):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 0
+
+        def history(account_id, since_ms=None):
+            return [since_ms]
+
+        with patch.object(ct_poller, "history_flights", AsyncSingleFlight()), \
+                patch.object(ct_poller, "_sync_deal_history", sync), \
+                patch.object(ct_poller.deal_store, "history", history):
+            results = await asyncio.gather(
+                ct_poller._sync_and_load(7, 1_000),        # stats period leads
+                ct_poller._sync_and_load(7, None),         # full history joins
+            )
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, [[1_000], [None]])
+
+    async def test_forced_refresh_does_not_join_a_running_flight(self):
+        flights = AsyncSingleFlight()
+        calls = 0
+
+        async def query():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        leader = asyncio.ensure_future(flights.do(7, query))
+        await asyncio.sleep(0)
+        refreshes = [flights.do(7, query, fresh=True) for _ in range(2)]
+
+        self.assertEqual(await asyncio.gather(leader, *refreshes), [1, 2, 2])
+        self.assertEqual(flights.stats(), {"started": 2, "shared": 1, "running": 0})
+
+    async def test_cancelled_caller_does_not_cancel_the_query(self):
+        flights = AsyncSingleFlight()
+
+        async def query():
+            await asyncio.sleep(0.02)
+            return "deals"
+
+        leader = asyncio.ensure_future(flights.do(7, query))
+        await asyncio.sleep(0)
+        joiner = asyncio.ensure_future(flights.do(7, query))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        self.assertEqual(await joiner, "deals")
+        self.assertTrue(leader.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from symbol_registry import SymbolRegistry  # noqa: E402
+
+
+class SymbolRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def lookup(name):
+            self.calls.append(name)
+            if name == "UNKNOWN":
+                return None
+            return SimpleNamespace(
+                point=0.001 if name.endswith("JPY") else 0.00001,
+                digits=3 if name.endswith("JPY") else 5,
+                trade_contract_size=100000.0,
+                currency_profit=name[-3:],
+            )
+
+        self.registry = SymbolRegistry(lookup)
+
+    def test_metadata_is_fetched_once_per_symbol(self):
+        for _ in range(3):
+            self.assertAlmostEqual(self.registry.pip_size("EURUSD"), 0.0001)
+            self.assertAlmostEqual(self.registry.pip_size("USDJPY"), 0.01)
+
+        meta = self.registry.get("USDJPY")
+        self.assertEqual((meta.digits, meta.contract_size, meta.profit_currency), (3, 100000.0, "JPY"))
+        self.assertEqual(self.calls, ["EURUSD", "USDJPY"])
+
+    def test_unknown_symbols_are_cached_until_refresh(self):
+        self.assertEqual(self.registry.pip_size("UNKNOWN"), 0.0)
+        self.assertIsNone(self.registry.get("UNKNOWN"))
+        self.assertEqual(self.calls, ["UNKNOWN"])
+
+        self.registry.refresh("UNKNOWN")
+        self.registry.get("UNKNOWN")
+        self.registry.get("EURUSD")
+        self.registry.refresh()
+        self.registry.get("EURUSD")
+
+        self.assertEqual(self.calls, ["UNKNOWN", "UNKNOWN", "EURUSD", "EURUSD"])
+
+
+if __name__ == "__main__":
+    unittest.main()
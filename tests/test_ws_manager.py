@@ -0,0 +1,166 @@
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "mt5_server"))
+
+from ws_manager import QUEUE_MAX, WebSocketManager  # noqa: E402
+
+
+class _FakeSocket:
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+        self.closed = False
+        self.sending = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sending = True
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.sent.append(json.loads(text))
+        finally:
+            self.sending = False
+
+    async def close(self, code=1000):
+        self.closed = True
+
+
+def _position(ticket, profit=1.0):
+    return {"ticket": ticket, "symbol": "EURUSD", "profit_raw": profit, "pnl_net": profit}
+
+
+def _snapshot(equity=1000.0, positions=(), ts="2025-03-03T10:00:00"):
+    return {
+        "account": {"login": 1, "balance": 1000.0, "equity": equity},
+        "positions": list(positions),
+        "timestamp": ts,
+    }
+
+
+async def _drain(manager):
+    """Wait until every queued frame has been sent (or its client evicted and closed)."""
+    clients = list(manager._clients.values())
+    while True:
+        live = manager._clients.values()
+        busy = [
+            c for c in clients
+            if not c.task.done() and (c.queue or c.ws.sending or c not in live)
+        ]
+        if not busy:
+            return
+        await asyncio.sleep(0.005)
+
+
+class WebSocketManagerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.manager = WebSocketManager(send_timeout=0.05)
+        self.ws = _FakeSocket()
+
+    async def test_connect_gets_full_snapshot_then_deltas(self):
+        await self.manager.broadcast(_snapshot(positions=[_position(1), _position(2)]))
+        await self.manager.connect(self.ws)
+        await self.manager.broadcast(_snapshot(equity=1001.5, positions=[_position(2, 3.0), _position(3)]))
+        await _drain(self.manager)
+
+        first, delta = self.ws.sent
+        self.assertEqual(first["type"], "snapshot")
+        self.assertEqual([p["ticket"] for p in first["positions"]], [1, 2])
+        self.assertEqual(delta["type"], "delta")
+        self.assertEqual(delta["seq"], first["seq"] + 1)
+        self.assertEqual(delta["account"], {"equity": 1001.5})
+        self.assertEqual(delta["positions"], {
+            "added":   [_position(3)],
+            "changed": [{"ticket": 2, "profit_raw": 3.0, "pnl_net": 3.0}],
+            "removed": [1],
+        })
+
+    async def test_unchanged_tick_sends_nothing(self):
+        await self.manager.connect(self.ws)
+        await self.manager.broadcast(_snapshot(positions=[_position(1)]))
+        await self.manager.broadcast(_snapshot(positions=[_position(1)], ts="2025-03-03T10:00:01"))
+        await _drain(self.manager)
+
+        self.assertEqual(len(self.ws.sent), 1)
+
+    async def test_resync_returns_current_state(self):
+        await self.manager.connect(self.ws)
+        await self.manager.broadcast(_snapshot(positions=[_position(1)]))
+        await self.manager.broadcast(_snapshot(equity=990.0, positions=[_position(1, -9.0)]))
+        await _drain(self.manager)
+        await self.manager.send_snapshot(self.ws)
+        await _drain(self.manager)
+
+        resync = self.ws.sent[-1]
+        self.assertEqual(resync["type"], "snapshot")
+        self.assertEqual(resync["seq"], self.ws.sent[-2]["seq"])
+        self.assertEqual(resync["account"]["equity"], 990.0)
+        self.assertEqual(resync["positions"], [_position(1, -9.0)])
+
+    async def test_lost_account_is_sent_as_snapshot(self):
+        await self.manager.connect(self.ws)
+        await self.manager.broadcast(_snapshot())
+        await self.manager.broadcast({"account": None, "positions": [], "timestamp": None})
+        await _drain(self.manager)
+
+        self.assertEqual([m["type"] for m in self.ws.sent], ["snapshot", "snapshot"])
+        self.assertIsNone(self.ws.sent[-1]["account"])
+
+    async def test_slow_client_is_evicted_without_delaying_others(self):
+        slow = _FakeSocket(delay=1.0)
+        await self.manager.connect(self.ws)
+        await self.manager.connect(slow)
+
+        await self.manager.broadcast(_snapshot())
+        await self.manager.broadcast(_snapshot(equity=1005.0))
+        await _drain(self.manager)
+
+        self.assertEqual([m["seq"] for m in self.ws.sent], [1, 2])
+        self.assertTrue(slow.closed)
+        self.assertEqual(self.manager.stats()["clients"], 1)
+        self.assertEqual(self.manager.stats()["evicted"], 1)
+
+    async def test_broadcast_does_not_wait_for_sends(self):
+        manager = WebSocketManager(send_timeout=1.0)
+        slow = _FakeSocket(delay=0.03)
+        await manager.connect(slow)
+
+        await manager.broadcast(_snapshot())
+
+        self.assertEqual(slow.sent, [])
+        await _drain(manager)
+        self.assertEqual(len(slow.sent), 1)
+
+    async def test_backlog_coalesces_into_latest_snapshot(self):
+        lagging = _FakeSocket(delay=0.01)
+        await self.manager.connect(lagging)
+
+        for i in range(QUEUE_MAX * 3):
+            await self.manager.broadcast(_snapshot(equity=1000.0 + i))
+        queue = self.manager.stats()["queues"][0]
+        self.assertLessEqual(queue["depth"], QUEUE_MAX)
+        self.assertGreater(queue["dropped"], 0)
+        await _drain(self.manager)
+
+        # Whatever was dropped is covered by a later snapshot; deltas it
+        # already contains (seq <= its seq) are stale
+        self.assertLess(len(lagging.sent), QUEUE_MAX * 3)
+        snapshot = max((m for m in lagging.sent if m["type"] == "snapshot"), key=lambda m: m["seq"])
+        equity = snapshot["account"]["equity"]
+        for m in lagging.sent:
+            if m["type"] == "delta" and m["seq"] > snapshot["seq"]:
+                equity = m["account"]["equity"]
+        self.assertEqual(lagging.sent[-1]["seq"], QUEUE_MAX * 3)
+        self.assertEqual(equity, 1000.0 + QUEUE_MAX * 3 - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()